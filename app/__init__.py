@@ -1,7 +1,9 @@
 import logging
+import os
 
+# Set LOG_LEVEL=DEBUG for per-request detail
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 
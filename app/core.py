@@ -1,11 +1,15 @@
 import os
 import time
-import uuid
+import hashlib
 import logging
 from io import BytesIO
-from typing import Optional
-from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
+import threading
+
+from cachetools import LRUCache
 
 from .settings import settings
 
@@ -14,71 +18,153 @@ logger = logging.getLogger("bg_removal_api")
 # Semaphore to limit concurrent processing
 processing_semaphore = asyncio.Semaphore(settings.MAX_WORKERS)
 
+# Worker threads that run the blocking rembg inference and PNG encoding
+_REMBG_POOL = ThreadPoolExecutor(
+    max_workers=settings.MAX_WORKERS, thread_name_prefix="rembg")
+
+# Shared rembg session, created on first use
+_rembg_session = None
+_rembg_session_lock = threading.Lock()
+
+# In-memory LRU of processed PNG bytes keyed by image hash
+image_cache = LRUCache(maxsize=settings.CACHE_SIZE)
+
+# Per-hash locks (with a user count) so identical images are processed once
+_hash_locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+
+@asynccontextmanager
+async def hash_lock(image_hash: str):
+    lock, users = _hash_locks.get(image_hash, (None, 0))
+    lock = lock or asyncio.Lock()
+    _hash_locks[image_hash] = (lock, users + 1)
+    try:
+        async with lock:
+            yield
+    finally:
+        lock, users = _hash_locks[image_hash]
+        if users <= 1:
+            del _hash_locks[image_hash]
+        else:
+            _hash_locks[image_hash] = (lock, users - 1)
+
+
+def content_hash(image_data: bytes) -> str:
+    # Identical uploads map to the same key, so repeats hit the cache
+    return hashlib.blake2b(image_data, digest_size=16).hexdigest()
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
 
-@lru_cache(maxsize=settings.CACHE_SIZE)
-def get_cached_image(image_hash: str) -> Optional[bytes]:
-    cache_path = os.path.join(settings.TEMP_DIR, f"{image_hash}.png")
-    if os.path.exists(cache_path):
-        with open(cache_path, "rb") as f:
-            return f.read()
+
+def _write_file(path: str, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+async def get_cached_image(image_hash: str) -> Optional[bytes]:
+    cached = image_cache.get(image_hash)
+    if cached is not None:
+        return cached
+
+    # Files are only kept on disk when KEEP_TEMP_FILES is enabled
+    if settings.KEEP_TEMP_FILES:
+        cache_path = os.path.join(settings.TEMP_DIR, f"{image_hash}.png")
+        if os.path.exists(cache_path):
+            cached = await asyncio.to_thread(_read_file, cache_path)
+            image_cache[image_hash] = cached
+            return cached
     return None
 
 
-def save_to_cache(image_hash: str, image_data: bytes) -> None:
+async def save_to_cache(image_hash: str, image_data: bytes) -> None:
+    image_cache[image_hash] = image_data
     if settings.KEEP_TEMP_FILES:
         cache_path = os.path.join(settings.TEMP_DIR, f"{image_hash}.png")
-        with open(cache_path, "wb") as f:
-            f.write(image_data)
+        await asyncio.to_thread(_write_file, cache_path, image_data)
+
+
+def get_rembg_session():
+    global _rembg_session
+    with _rembg_session_lock:
+        if _rembg_session is None:
+            from rembg import new_session
+
+            # rembg reads the ONNX Runtime thread count from OMP_NUM_THREADS
+            if settings.REMBG_THREADS:
+                os.environ["OMP_NUM_THREADS"] = str(settings.REMBG_THREADS)
+
+            # Providers that are not available are skipped by rembg
+            providers = ["CUDAExecutionProvider", "CPUExecutionProvider"]
+            if settings.REMBG_MODEL_PATH:
+                # Custom (e.g. int8-quantized) U^2-Net graph
+                _rembg_session = new_session(
+                    "u2net_custom", providers=providers,
+                    model_path=settings.REMBG_MODEL_PATH)
+            else:
+                _rembg_session = new_session(
+                    settings.REMBG_MODEL, providers=providers)
+            logger.info(
+                "Loaded rembg model %s with providers %s",
+                _rembg_session.model_name, _rembg_session.providers)
+    return _rembg_session
 
 
-async def remove_background(image_data: bytes, image_hash: str = None) -> bytes:
+def _run_rembg(image_data: bytes) -> bytes:
     # Defer imports until the function is called
-    return
     from PIL import Image
     import rembg
 
-    async with processing_semaphore:
+    input_image = Image.open(BytesIO(image_data))
+
+    # Remove background using rembg
+    output_image = rembg.remove(
+        input_image,
+        session=get_rembg_session(),
+        alpha_matting=True,
+        alpha_matting_foreground_threshold=240,
+        alpha_matting_background_threshold=10,
+    )
+
+    # Ensure the output image is in PNG format (RGBA mode if it has transparency)
+    if output_image.mode != "RGBA":
+        output_image = output_image.convert("RGBA")
+
+    # Save to BytesIO as PNG explicitly. PNG ignores quality, and optimize=True
+    # forces the slowest zlib search, so use a fast compression level instead
+    output_buffer = BytesIO()
+    output_image.save(
+        output_buffer,
+        format="PNG",  # Explicitly specify PNG format
+        compress_level=settings.PNG_COMPRESS_LEVEL
+    )
+    return output_buffer.getvalue()
+
+
+async def remove_background(image_data: bytes, image_hash: str) -> bytes:
+    async with hash_lock(image_hash):
         try:
-            if not image_hash:
-                image_hash = str(uuid.uuid4())
-
-            cached = get_cached_image(image_hash)
+            cached = await get_cached_image(image_hash)
             if cached:
-                logger.info(f"Cache hit for image {image_hash}")
+                logger.info("Cache hit for image %s", image_hash)
                 return cached
 
             start_time = time.time()
-            input_image = Image.open(BytesIO(image_data))
-
-            # Remove background using rembg
-            output_image = rembg.remove(
-                input_image,
-                alpha_matting=True,
-                alpha_matting_foreground_threshold=240,
-                alpha_matting_background_threshold=10,
-            )
-
-            # Ensure the output image is in PNG format (RGBA mode if it has transparency)
-            if output_image.mode != "RGBA":
-                output_image = output_image.convert("RGBA")
-
-            # Save to BytesIO as PNG explicitly
-            output_buffer = BytesIO()
-            output_image.save(
-                output_buffer,
-                format="PNG",  # Explicitly specify PNG format
-                quality=settings.OUTPUT_QUALITY,
-                optimize=True
-            )
-            output_data = output_buffer.getvalue()
-
-            save_to_cache(image_hash, output_data)
+
+            # Run inference off the event loop; the semaphore gates admission
+            async with processing_semaphore:
+                output_data = await asyncio.get_running_loop().run_in_executor(
+                    _REMBG_POOL, _run_rembg, image_data)
+
+            await save_to_cache(image_hash, output_data)
 
             processing_time = time.time() - start_time
             logger.info(
-                f"Processed image {image_hash} in {processing_time:.2f}s")
+                "Processed image %s in %.2fs", image_hash, processing_time)
 
             return output_data
         except Exception as e:
-            logger.error(f"Error processing image: {str(e)}")
+            logger.error("Error processing image: %s", e)
             raise
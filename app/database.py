@@ -1,24 +1,111 @@
-from pymongo import MongoClient
-from pymongo.collection import Collection
-from pymongo.errors import ConnectionFailure
+from datetime import datetime, timezone
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from pymongo import UpdateOne
+from pymongo.collation import Collation
+from pymongo.write_concern import WriteConcern
 from .settings import settings
 
+# Case-insensitive ordering used by the title index and title searches
+TITLE_COLLATION = Collation(locale="en", strength=2)
+
+# Documents converted per bulk_write by migrate_image_dates
+MIGRATION_BATCH_SIZE = 1000
+
 
 class Database:
     def __init__(self):
-        self.client = MongoClient(settings.MONGODB_URI)
-        print("Attempting to connect to MongoDB")
-        try:
-            self.client.admin.command("ping")
-            print("Successfully connected to MongoDB")
-        except ConnectionFailure:
-            raise ConnectionError("Failed to connect to MongoDB")
+        # Motor connects lazily, so nothing blocks at import time
+        self.client = AsyncIOMotorClient(
+            settings.MONGODB_URI,
+            maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+            compressors=settings.MONGODB_COMPRESSORS,
+            retryWrites=True,
+            # Dates are stored in UTC; read them back as aware datetimes so
+            # they compare and serialize like the ones the app writes
+            tz_aware=True,
+            w="majority",
+            serverSelectionTimeoutMS=settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        )
         self.db = self.client["bg_removal_db"]
-        self.images_collection: Collection = self.db["vendor_images"]
-        self.folders_collection: Collection = self.db["vendor_folders"]
+        image_w = settings.MONGODB_IMAGE_WRITE_CONCERN
+        self.images_collection: AsyncIOMotorCollection = self.db.get_collection(
+            "vendor_images",
+            write_concern=WriteConcern(w=int(image_w) if image_w.isdigit() else image_w))
+        self.folders_collection: AsyncIOMotorCollection = self.db["vendor_folders"]
+        self.jobs_collection: AsyncIOMotorCollection = self.db["upload_jobs"]
+        # One marker document per completed one-off data migration
+        self.migrations_collection: AsyncIOMotorCollection = self.db["migrations"]
+
+    async def migrate_image_dates(self) -> int:
+        # Older images stored uploadedAt and created_at as ISO strings; store
+        # them as dates so date operators, range queries and keyset cursors
+        # (which compare against datetimes) match every document. Runs until
+        # one worker completes it; new documents are always written with dates
+        if await self.migrations_collection.find_one({"_id": "image_dates"}):
+            return 0
+        modified = 0
+        for field in ("uploadedAt", "created_at"):
+            updates = []
+            async for doc in self.images_collection.find(
+                    {field: {"$type": "string"}}, {field: 1}):
+                try:
+                    value = datetime.fromisoformat(
+                        doc[field].replace("Z", "+00:00"))
+                except ValueError:
+                    continue  # Leave values that aren't ISO dates as they are
+                updates.append(
+                    UpdateOne({"_id": doc["_id"]}, {"$set": {field: value}}))
+                if len(updates) == MIGRATION_BATCH_SIZE:
+                    result = await self.images_collection.bulk_write(
+                        updates, ordered=False)
+                    modified += result.modified_count
+                    updates = []
+            if updates:
+                result = await self.images_collection.bulk_write(
+                    updates, ordered=False)
+                modified += result.modified_count
+        await self.migrations_collection.update_one(
+            {"_id": "image_dates"},
+            {"$set": {"completed_at": datetime.now(timezone.utc)}}, upsert=True)
+        return modified
 
+    async def ensure_indexes(self):
         # Create index on vendor_id for faster queries
-        self.images_collection.create_index("vendor_id")
+        await self.images_collection.create_index("vendor_id")
+        # Folder listings page by (uploadedAt, _id) within a vendor's folder
+        await self.images_collection.create_index(
+            [("vendor_id", 1), ("folder_id", 1), ("uploadedAt", -1), ("_id", -1)])
+        # Vendor-wide listings page by (uploadedAt, _id) within a vendor
+        await self.images_collection.create_index(
+            [("vendor_id", 1), ("uploadedAt", -1), ("_id", -1)])
+        # Filter options: distinct tags, categories and formats per vendor
+        # (tags is multikey)
+        await self.images_collection.create_index(
+            [("vendor_id", 1), ("tags", 1)])
+        await self.images_collection.create_index(
+            [("vendor_id", 1), ("category", 1)])
+        await self.images_collection.create_index(
+            [("vendor_id", 1), ("format", 1)])
+        # Realtime stats: unprocessed images and recent uploads per vendor
+        await self.images_collection.create_index(
+            [("vendor_id", 1), ("processed", 1)])
+        await self.images_collection.create_index(
+            [("vendor_id", 1), ("created_at", -1)])
+        # Case-insensitive title prefix search
+        await self.images_collection.create_index(
+            [("title", 1)], collation=TITLE_COLLATION)
+        # Folder listings page by _id within a vendor
+        await self.folders_collection.create_index(
+            [("vendor_id", 1), ("_id", 1)])
+        # Finished upload jobs are only polled briefly, so expire them
+        await self.jobs_collection.create_index(
+            "created_at", expireAfterSeconds=24 * 60 * 60)
+        # Folder names are unique per vendor; created last because it fails
+        # if existing data already contains duplicates
+        await self.folders_collection.create_index(
+            [("vendor_id", 1), ("folder_name", 1)], unique=True)
 
 
 db = Database()
@@ -2,40 +2,78 @@ import logging
 import os
 import time
 import uuid
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Query, Depends, Body, Form
-from fastapi.responses import JSONResponse
+from io import BytesIO
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Depends, Body, Form, Request
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
-from pymongo.errors import DuplicateKeyError
+import cloudinary.api_client.call_api
+import cloudinary.exceptions
+import cloudinary.utils
+from urllib3.util.retry import Retry
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from bson.objectid import ObjectId
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
-import shutil
+from typing import List, Literal, Optional, Dict, Any, Set, Tuple
+from datetime import datetime, timedelta, timezone
 import json
-
-from .core import remove_background
-from .utils import cleanup_temp_files
+import asyncio
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import orjson
+from cachetools import TTLCache
+
+from .core import remove_background, content_hash
+from .utils import (MongoJSONResponse, etag_response, keyset_filter, orjson_default,
+                    page_cursor, UploadSizeLimitMiddleware)
 from .settings import settings
-from .database import db
-from .models import (ImageMetadata, Folder, ImageMetadata,
-                     ImageSearchResult,
+from .database import db, TITLE_COLLATION
+from .models import (ImageMetadata, Folder,
                      PaginatedImageMetadata,
                      PaginatedImageSearchResults,
                      ImageProcessingOptions,
                      FilterOptions)
 
-# Set up logging with DEBUG level for detailed output
-logging.basicConfig(level=logging.DEBUG)
+# Logging is configured in the package __init__ (LOG_LEVEL, default INFO)
 logger = logging.getLogger("bg_removal_api")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_time = time.time()
+    logger.debug("Application startup started")
+    # Configure clients once so requests never pay for initialization;
+    # indexes are built in the background so startup never waits on MongoDB
+    configure_cloudinary()
+    await ping_mongodb()
+    app.state.index_task = asyncio.create_task(prepare_database())
+    logger.debug("Startup took %.2f seconds", time.time() - start_time)
+    yield
+    app.state.index_task.cancel()
+    # Let queued uploads finish before their clients go away; jobs still
+    # running after the timeout are cancelled and marked failed
+    if upload_jobs:
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*upload_jobs, return_exceptions=True),
+                timeout=settings.UPLOAD_JOB_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Cancelled %s upload jobs still running at shutdown", len(upload_jobs))
+    db.client.close()
+    _CLOUDINARY_POOL.shutdown(wait=False)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Background Removal API",
     description="API for managing vendor images with folders and optional background removal using Cloudinary",
     version="1.0.0",
+    default_response_class=MongoJSONResponse,
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -46,102 +84,416 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Compress JSON listings; small bodies aren't worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Room for multipart framing and form fields on top of the file itself
+MAX_REQUEST_BYTES = settings.MAX_UPLOAD_BYTES + 64 * 1024
+# Size of each read when buffering an upload
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Maximum number of files accepted by /remove-background-batch
+MAX_BATCH_FILES = 20
+MAX_BATCH_REQUEST_BYTES = MAX_REQUEST_BYTES * MAX_BATCH_FILES
+# Magic bytes at the start of every PNG file
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+# Reject oversized bodies before they are parsed and spooled
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/remove-background": MAX_REQUEST_BYTES,
+        "/remove-background-batch": MAX_BATCH_REQUEST_BYTES,
+        "/api/seller/image-bucket": MAX_REQUEST_BYTES,
+    },
+)
+
 
 # Mount static files
 app.mount("/static", StaticFiles(directory=settings.STATIC_DIR), name="static")
 
-# Lazy initialization for Cloudinary and MongoDB
-cloudinary_initialized = False
-mongodb_initialized = False
+# Cloudinary's delete_resources accepts at most 100 public IDs per call
+CLOUDINARY_DELETE_BATCH_SIZE = 100
+# Maximum number of Cloudinary delete calls in flight per request
+CLOUDINARY_DELETE_CONCURRENCY = 8
+# Cloudinary calls in flight across all requests; uploads are I/O bound,
+# so this rather than CPU sets upload throughput
+cloudinary_semaphore = asyncio.Semaphore(settings.CLOUDINARY_CONCURRENCY)
+# Dedicated threads so uploads don't queue behind the default executor's
+# small, CPU-sized pool
+_CLOUDINARY_POOL = ThreadPoolExecutor(
+    max_workers=settings.CLOUDINARY_CONCURRENCY, thread_name_prefix="cloudinary")
+
+# (vendor_id, folder ObjectId) pairs whose ownership was recently confirmed,
+# so repeated uploads into a folder skip the lookup
+verified_folders = TTLCache(maxsize=10000, ttl=settings.FOLDER_CACHE_TTL)
+
+# Upload jobs running in the background, referenced so they aren't
+# garbage collected before they finish
+upload_jobs: Set[asyncio.Task] = set()
+# Free slots for pending upload jobs; a job holds one until it finishes
+upload_job_slots = asyncio.Semaphore(settings.MAX_PENDING_UPLOAD_JOBS)
+
+# Recent image counts keyed by (vendor_id, serialized query); cross-vendor
+# searches use a vendor_id of None
+count_cache = TTLCache(maxsize=10000, ttl=settings.COUNT_CACHE_TTL)
+
+# Serialized search responses keyed by the request's search parameters
+search_cache = TTLCache(maxsize=1000, ttl=settings.SEARCH_CACHE_TTL)
+
+# Serialized FilterOptions per vendor_id
+filter_cache = TTLCache(maxsize=10000, ttl=settings.FILTER_CACHE_TTL)
+
+# Serialized dashboard stats keyed by ("bucket" or "realtime", vendor_id)
+stats_cache = TTLCache(maxsize=10000, ttl=settings.STATS_CACHE_TTL)
+# Stats computations in flight, shared by concurrent misses on the same key
+stats_inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+# Fields returned by the folder listing
+FOLDER_LIST_PROJECTION = {"folder_name": 1, "vendor_id": 1, "created_at": 1}
+
+# Fields read when building ImageSearchResult entries
+SEARCH_RESULT_PROJECTION = {
+    "title": 1, "description": 1, "tags": 1, "category": 1,
+    "thumbnailUrl": 1, "url": 1, "dimensions": 1, "format": 1,
+}
+
+# Fields read when building bucket ImageMetadata entries
+BUCKET_IMAGE_PROJECTION = {
+    "filename": 1, "description": 1, "tags": 1, "category": 1,
+    "created_at": 1, "size": 1, "dimensions": 1, "format": 1, "url": 1,
+    "thumbnailUrl": 1, "isPublic": 1, "vendor_id": 1, "processed": 1, "public_id": 1,
+    "folder_id": 1,
+}
+
+# Keys of an image listing row, in response order
+IMAGE_METADATA_FIELDS = tuple(ImageMetadata.model_fields)
+
+# Sort fields the listing indexes serve with _id as tie-breaker; other
+# fields would be sorted in memory
+ImageSortField = Literal["uploadedAt"]
+
+# Key under which the image list pipelines return the raw sort value
+SORT_KEY = "_sort"
+
+# Final $project of the image list pipelines: Mongo stringifies _id and fills
+# defaults, so each result can be passed straight to ImageMetadata
+IMAGE_LIST_STAGE = {"$project": {
+    "id": {"$toString": "$_id"},
+    "title": {"$ifNull": ["$title", "Untitled"]},
+    "description": 1,
+    "tags": {"$ifNull": ["$tags", []]},
+    "category": 1,
+    "uploadedAt": 1,
+    "created_at": 1,
+    "size": {"$ifNull": ["$size", 0]},
+    "dimensions": {"$ifNull": ["$dimensions", {"width": 0, "height": 0}]},
+    "format": {"$ifNull": ["$format", "unknown"]},
+    "url": 1,
+    "thumbnailUrl": 1,
+    "isPublic": {"$ifNull": ["$isPublic", False]},
+    "vendor_id": 1,
+    "processed": {"$ifNull": ["$processed", False]},
+    "public_id": 1,
+    "folder_id": 1,
+}}
+
+
+def configure_cloudinary():
+    cloudinary.config(
+        cloud_name=settings.CLOUDINARY_NAME,
+        api_key=settings.CLOUDINARY_API_KEY,
+        api_secret=settings.CLOUDINARY_API_SECRET
+    )
+    # The SDK's shared urllib3 pools keep a single connection per host;
+    # widen them so concurrent uploads reuse keep-alive TLS sockets. Only
+    # connection failures are retried, since a request that reached the server
+    # may already have taken effect
+    http = cloudinary.utils.get_http_connector(
+        cloudinary.config(),
+        dict(cloudinary.CERT_KWARGS,
+             maxsize=settings.CLOUDINARY_POOL_SIZE,
+             retries=Retry(total=None, connect=2, read=0, status=0, other=0,
+                           redirect=3, backoff_factor=0.2))
+    )
+    cloudinary.uploader._http = http
+    cloudinary.api_client.call_api._http = http
+    logger.debug("Cloudinary initialized successfully")
+
+
+async def ping_mongodb():
+    try:
+        await db.client.admin.command("ping")
+        logger.debug("MongoDB connection verified")
+    except Exception as e:
+        # Motor reconnects on demand, so a failed ping doesn't stop startup
+        logger.error("Failed to connect to MongoDB: %s", e)
 
 
-def init_cloudinary():
-    global cloudinary_initialized
-    if not cloudinary_initialized:
-        try:
-            cloudinary.config(
-                cloud_name=settings.CLOUDINARY_NAME,
-                api_key=settings.CLOUDINARY_API_KEY,
-                api_secret=settings.CLOUDINARY_API_SECRET
-            )
-            cloudinary_initialized = True
-            logger.debug("Cloudinary initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize Cloudinary: {str(e)}")
-            raise
+async def read_upload(file: UploadFile) -> bytes:
+    """
+    Read an upload in chunks, failing fast once it exceeds MAX_UPLOAD_BYTES
+    """
+    buffer = BytesIO()
+    total = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        total += len(chunk)
+        if total > settings.MAX_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Upload exceeds {settings.MAX_UPLOAD_BYTES} bytes")
+        buffer.write(chunk)
+    return buffer.getvalue()
 
 
-def init_mongodb():
-    global mongodb_initialized
-    if not mongodb_initialized:
-        try:
-            # Minimal operation to verify connection
-            db.images_collection.count_documents(
-                {'_id': {'$exists': True}}, limit=1)
-            mongodb_initialized = True
-            logger.debug("MongoDB connection verified")
-        except Exception as e:
-            logger.error(f"Failed to connect to MongoDB: {str(e)}")
-            raise
+def upload_size(file: UploadFile) -> int:
+    """
+    Size of a spooled upload without reading it, failing once it exceeds MAX_UPLOAD_BYTES
+    """
+    size = file.size
+    if size is None:
+        size = file.file.seek(0, os.SEEK_END)
+    if size > settings.MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Upload exceeds {settings.MAX_UPLOAD_BYTES} bytes")
+    return size
+
+
+def write_temp_file(path: str, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+async def call_cloudinary(func, *args, **kwargs):
+    """
+    Run a blocking Cloudinary SDK call in a worker thread, bounded by the shared semaphore
+    """
+    async with cloudinary_semaphore:
+        return await asyncio.get_running_loop().run_in_executor(
+            _CLOUDINARY_POOL, partial(func, *args, **kwargs))
+
+
+def image_asset_ids(image: Dict[str, Any]) -> List[str]:
+    """
+    Cloudinary public IDs belonging to an image document: the image itself,
+    plus a separate _thumb asset unless the document has an eager thumbnail,
+    which is derived from the image and goes with it. Images from the
+    original upload path have a _thumb asset but no thumbnailUrl; for images
+    that never had one, Cloudinary just reports the ID as not found
+    """
+    public_id = image["public_id"]
+    thumbnail_id = f"{public_id}_thumb"
+    thumbnail_url = image.get("thumbnailUrl")
+    if public_id.endswith("_thumb") or (
+            thumbnail_url and thumbnail_id not in thumbnail_url):
+        return [public_id]
+    return [public_id, thumbnail_id]
+
+
+async def delete_image_assets(image: Dict[str, Any]) -> None:
+    """
+    Delete an image's Cloudinary assets; a lone asset skips the Admin API
+    """
+    public_ids = image_asset_ids(image)
+    if len(public_ids) == 1:
+        await call_cloudinary(
+            cloudinary.uploader.destroy, public_ids[0], resource_type="image")
+    else:
+        await delete_cloudinary_resources(public_ids)
+
+
+async def delete_cloudinary_resources(public_ids: List[str]) -> None:
+    """
+    Delete Cloudinary assets in batches, running the batches concurrently
+    """
+    semaphore = asyncio.Semaphore(CLOUDINARY_DELETE_CONCURRENCY)
+
+    async def delete_batch(batch: List[str]):
+        async with semaphore:
+            try:
+                return await call_cloudinary(
+                    cloudinary.api.delete_resources, batch, resource_type="image")
+            except cloudinary.exceptions.Error as e:
+                # The Admin API can be unavailable or rate limited; fall back to
+                # the Upload API, one destroy per asset, run concurrently
+                logger.warning(
+                    "delete_resources failed, destroying %s assets one by one: %s",
+                    len(batch), e)
+                return await asyncio.gather(*[
+                    call_cloudinary(cloudinary.uploader.destroy,
+                                    public_id, resource_type="image")
+                    for public_id in batch
+                ])
+
+    await asyncio.gather(*[
+        delete_batch(public_ids[i:i + CLOUDINARY_DELETE_BATCH_SIZE])
+        for i in range(0, len(public_ids), CLOUDINARY_DELETE_BATCH_SIZE)
+    ])
+
+
+async def fetch_image_page(query: Dict[str, Any], cursor_filter: Dict[str, Any],
+                           sort: Dict[str, int], skip: int, limit: int,
+                           projection: Dict[str, Any], vendor_id: Optional[str] = None,
+                           **kwargs) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    One page of images plus the total matching query. A recent total is
+    reused from count_cache; otherwise it is counted alongside the page
+    """
+    # $match, $sort and $limit lead the pipeline so the page is read in index
+    # order; $project runs last on just the page's documents
+    page_stages = [{"$match": cursor_filter}] if cursor_filter else []
+    page_stages.append({"$sort": sort})
+    if skip:
+        page_stages.append({"$skip": skip})
+    page_stages += [{"$limit": limit}, {"$project": projection}]
+    page = db.images_collection.aggregate(
+        [{"$match": query}, *page_stages], batchSize=limit, **kwargs
+    ).to_list(length=limit)
+
+    key = (vendor_id, orjson.dumps(
+        query, default=orjson_default, option=orjson.OPT_SORT_KEYS))
+    total = count_cache.get(key)
+    if total is not None:
+        return total, await page
+
+    # Not a $facet: stages inside one can't use indexes, so the page would be
+    # sorted in memory. The count is its own indexed query, run concurrently
+    total, results = await asyncio.gather(
+        db.images_collection.count_documents(query, **kwargs), page)
+    count_cache[key] = total
+    return total, results
+
+
+def invalidate_image_caches(vendor_id: str) -> None:
+    """
+    Drop cached counts, searches and filter options that a write to this
+    vendor's images may have changed; searches span vendors, so all of them go
+    """
+    for key in list(count_cache.keys()):
+        if key[0] is None or key[0] == vendor_id:
+            count_cache.pop(key, None)
+    search_cache.clear()
+    filter_cache.pop(vendor_id, None)
+    stats_cache.pop(("bucket", vendor_id), None)
+    stats_cache.pop(("realtime", vendor_id), None)
+
+
+def to_image_metadata(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    ImageMetadata fields of an image document; the route's response_model
+    validates them
+    """
+    uploaded_at = doc.get("uploadedAt")
+    if uploaded_at is None:
+        uploaded_at = datetime.now(timezone.utc)
+    return dict(
+        id=str(doc["_id"]),
+        title=doc.get("title", "Untitled"),
+        description=doc.get("description"),
+        tags=doc.get("tags", []),
+        category=doc.get("category"),
+        uploadedAt=uploaded_at,
+        size=doc.get("size", 0),
+        dimensions=doc.get("dimensions", {"width": 0, "height": 0}),
+        format=doc.get("format", "unknown"),
+        url=doc.get("url"),
+        thumbnailUrl=doc.get("thumbnailUrl"),
+        isPublic=doc.get("isPublic", False),
+        vendor_id=doc.get("vendor_id"),
+        processed=doc.get("processed", False),
+        public_id=doc.get("public_id"),
+        folder_id=doc.get("folder_id")
+    )
+
+
+async def prepare_database():
+    # Dates are converted first so keyset cursors reach legacy images; a
+    # failed migration is logged without holding back the indexes
+    try:
+        migrated = await db.migrate_image_dates()
+        if migrated:
+            logger.info("Converted string dates on %s images", migrated)
+    except Exception as e:
+        logger.error("Failed to migrate image dates: %s", e)
+    try:
+        await db.ensure_indexes()
+        logger.debug("MongoDB indexes ensured")
+    except Exception as e:
+        logger.error("Failed to ensure MongoDB indexes: %s", e)
+    try:
+        failed = await fail_stale_upload_jobs()
+        if failed:
+            logger.warning("Marked %s interrupted upload jobs as failed", failed)
+    except Exception as e:
+        logger.error("Failed to clean up stale upload jobs: %s", e)
 
 
 # Ensure the temp directory exists without blocking startup
 if not os.path.exists(settings.TEMP_DIR):
     try:
         os.makedirs(settings.TEMP_DIR)
-        logger.debug(f"Created temp directory: {settings.TEMP_DIR}")
+        logger.debug("Created temp directory: %s", settings.TEMP_DIR)
     except Exception as e:
         logger.error(
-            f"Failed to create temp directory {settings.TEMP_DIR}: {str(e)}")
-
-# Minimal startup event to log readiness
-
-
-@app.on_event("startup")
-async def startup_event():
-    start_time = time.time()
-    logger.debug("Application startup started")
-    # Defer all external service initialization to first request
-    logger.debug("Application startup completed")
-    logger.debug(f"Startup took {time.time() - start_time:.2f} seconds")
+            "Failed to create temp directory %s: %s", settings.TEMP_DIR, e)
+
+# Cache-Control for read endpoints. The service description only changes
+# on deploy; search and filter results may lag writes by a minute, matching
+# the server-side caches; bucket listings are always revalidated
+ROOT_CACHE_CONTROL = "public, max-age=86400"
+LISTING_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+BUCKET_CACHE_CONTROL = "private, no-cache"
+
+# Static bodies for the root and health routes, serialized once at import
+_ROOT_BODY = orjson.dumps({
+    "service": "Background Removal API",
+    "status": "operational",
+    "endpoints": [
+        {"path": "/", "method": "GET", "description": "Service information"},
+        {"path": "/health", "method": "GET", "description": "Health check"},
+        {"path": "/remove-background", "method": "POST",
+            "description": "Upload and optionally remove background from vendor image"},
+        {"path": "/remove-background-batch", "method": "POST",
+            "description": "Upload several vendor images in one request"},
+        {"path": "/jobs/{job_id}", "method": "GET",
+            "description": "Status of a vendor's background upload"},
+        {"path": "/vendor-images/{vendor_id}", "method": "GET",
+            "description": "Get all images for a vendor"},
+        {"path": "/vendor-images/{vendor_id}/{folder_id}", "method": "GET",
+            "description": "Get images for a vendor in a specific folder"},
+        {"path": "/vendor-folders/{vendor_id}", "method": "GET",
+            "description": "Get all folders for a vendor"},
+        {"path": "/vendor-folders/{vendor_id}", "method": "POST",
+            "description": "Create a folder for a vendor"},
+        {"path": "/folders/{folder_id}", "method": "DELETE",
+            "description": "Delete a folder and its images"},
+        {"path": "/images/{image_id}", "method": "DELETE",
+            "description": "Delete a specific image by ID"},
+    ]
+})
+_HEALTH_BODY = orjson.dumps({"status": "healthy"})
 
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     logger.debug("Received request to root route")
-    return {
-        "service": "Background Removal API",
-        "status": "operational",
-        "endpoints": [
-            {"path": "/", "method": "GET", "description": "Service information"},
-            {"path": "/health", "method": "GET", "description": "Health check"},
-            {"path": "/remove-background", "method": "POST",
-                "description": "Upload and optionally remove background from vendor image"},
-            {"path": "/vendor-images/{vendor_id}", "method": "GET",
-                "description": "Get all images for a vendor"},
-            {"path": "/vendor-images/{vendor_id}/{folder_id}", "method": "GET",
-                "description": "Get images for a vendor in a specific folder"},
-            {"path": "/vendor-folders/{vendor_id}", "method": "GET",
-                "description": "Get all folders for a vendor"},
-            {"path": "/vendor-folders/{vendor_id}", "method": "POST",
-                "description": "Create a folder for a vendor"},
-            {"path": "/folders/{folder_id}", "method": "DELETE",
-                "description": "Delete a folder and its images"},
-            {"path": "/images/{image_id}", "method": "DELETE",
-                "description": "Delete a specific image by ID"},
-        ]
-    }
+    return etag_response(request, _ROOT_BODY, ROOT_CACHE_CONTROL)
 
 
 @app.get("/health")
 async def health_check():
     logger.debug("Received request to health route")
-    return {"status": "healthy"}
+    return Response(content=_HEALTH_BODY, media_type="application/json",
+                    headers={"Cache-Control": "no-store"})
 
 
 @app.get("/api/images/search", response_model=PaginatedImageSearchResults)
 async def search_images(
-    q: str = Query("", description="Search query"),
+    request: Request,
+    q: str = Query(
+        "", description="Case-insensitive title prefix; when set, the category, "
+                        "tag and format filters also ignore case"),
     categories: List[str] = Query(None, description="Filter by categories"),
     tags: List[str] = Query(None, description="Filter by tags"),
     formats: List[str] = Query(None, description="Filter by formats"),
@@ -151,15 +503,33 @@ async def search_images(
         None, description="End date for filter"),
     page: int = Query(1, description="Page number", ge=1),
     limit: int = Query(20, description="Results per page", ge=1, le=100),
+    after: Optional[str] = Query(
+        None, description="Cursor from a previous page; overrides page"),
 ):
     """
     Search for images based on query and filters
     """
-    try:
-        init_mongodb()
+    cache_key = orjson.dumps({
+        "q": q, "categories": sorted(categories or []),
+        "tags": sorted(tags or []), "formats": sorted(formats or []),
+        "start_date": start_date, "end_date": end_date,
+        "page": page, "limit": limit, "after": after,
+    }, option=orjson.OPT_SORT_KEYS)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return etag_response(request, cached, LISTING_CACHE_CONTROL)
 
-        # Build the query
-        query = {"title": {"$regex": q, "$options": "i"}}
+    try:
+        # Build the query; titles are matched by case-insensitive prefix as
+        # a range under TITLE_COLLATION, so the title index can serve it
+        # (U+FFFF sorts after every character). A collation covers the whole
+        # query, so with q the filters below ignore case too; without q
+        # they stay exact
+        query = {}
+        collation = {}
+        if q:
+            query["title"] = {"$gte": q, "$lt": q + "\uffff"}
+            collation["collation"] = TITLE_COLLATION
 
         # Apply filters
         if categories:
@@ -179,103 +549,122 @@ async def search_images(
             if date_query:
                 query["uploadedAt"] = date_query
 
-        # Get total count
-        total = db.images_collection.count_documents(query)
-
-        # Get paginated results
-        results = list(db.images_collection.find(query)
-                       .skip((page - 1) * limit)
-                       .limit(limit))
-
-        # Transform results to match ImageSearchResult
-        search_results = []
-        for img in results:
-            search_results.append(
-                ImageSearchResult(
-                    id=str(img["_id"]),
-                    title=img.get("title", "Untitled"),
-                    description=img.get("description"),
-                    tags=img.get("tags", []),
-                    category=img.get("category"),
-                    url=img.get("url"),
-                    dimensions=img.get(
-                        "dimensions", {"width": 0, "height": 0}),
-                    format=img.get("format", "unknown")
-                )
-            )
-
-        return {
+        # Newest first; seek past the cursor when one is given
+        cursor_filter = {}
+        if after:
+            try:
+                cursor_filter = keyset_filter(after, "_id", -1)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        # One extra row tells whether there is a next page
+        total, results = await fetch_image_page(
+            query, cursor_filter, {"_id": -1},
+            0 if after else (page - 1) * limit, limit + 1,
+            SEARCH_RESULT_PROJECTION, **collation)
+        results, cursor = page_cursor(results, limit, "_id")
+
+        # Shape results as ImageSearchResult dicts; returning the response
+        # directly skips a second validation pass through Pydantic
+        search_results = [{
+            "id": str(img["_id"]),
+            "title": img.get("title", "Untitled"),
+            "description": img.get("description"),
+            "tags": img.get("tags", []),
+            "category": img.get("category"),
+            "thumbnailUrl": img.get("thumbnailUrl"),
+            "url": img.get("url"),
+            "dimensions": img.get("dimensions", {"width": 0, "height": 0}),
+            "format": img.get("format", "unknown"),
+        } for img in results]
+
+        body = MongoJSONResponse(content={
             "results": search_results,
-            "total": total
-        }
-
+            "total": total,
+            "next_cursor": cursor
+        }).body
+        search_cache[cache_key] = body
+        return etag_response(request, body, LISTING_CACHE_CONTROL)
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error searching images: {str(e)}")
+        logger.error("Error searching images: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to search images: {str(e)}")
 
 
 @app.get("/api/seller/image-bucket", response_model=PaginatedImageMetadata)
 async def get_bucket_images(
+    request: Request,
     vendor_id: str = Query(..., description="Vendor ID"),
     page: int = Query(1, description="Page number", ge=1),
     limit: int = Query(50, description="Results per page", ge=1, le=100),
-    sortBy: str = Query("uploadedAt", description="Sort by field"),
-    sortOrder: str = Query("desc", description="Sort order (asc or desc)")
+    sortBy: ImageSortField = Query("uploadedAt", description="Sort by field"),
+    sortOrder: str = Query("desc", description="Sort order (asc or desc)"),
+    after: Optional[str] = Query(
+        None, description="Cursor from a previous page; overrides page"),
 ):
     """
     Get all images for a vendor with pagination and sorting
     """
     try:
-        init_mongodb()
-
         # Build the query
         query = {"vendor_id": vendor_id}
 
-        # Get total count
-        total = db.images_collection.count_documents(query)
-
-        # Set up sorting
+        # Set up sorting; _id breaks ties so cursors are stable
         sort_direction = -1 if sortOrder == "desc" else 1
         sort_field = sortBy
+        sort_keys = {sort_field: sort_direction, "_id": sort_direction}
 
-        # Get paginated results
-        results = list(db.images_collection.find(query)
-                       .sort(sort_field, sort_direction)
-                       .skip((page - 1) * limit)
-                       .limit(limit))
-
-        # Transform results to match frontend expected type
-        images = []
-        for img in results:
-            images.append(
-                ImageMetadata(
-                    id=str(img["_id"]),
-                    title=img.get("filename", "Untitled"),
-                    description=img.get("description"),
-                    tags=img.get("tags", []),
-                    category=img.get("category"),
-                    uploadedAt=img.get("created_at", datetime.now()),
-                    size=img.get("size", 0),
-                    dimensions=img.get(
-                        "dimensions", {"width": 0, "height": 0}),
-                    format=img.get("format", "unknown"),
-                    url=img.get("url"),
-                    isPublic=img.get("isPublic", False),
-                    vendor_id=img.get("vendor_id"),
-                    processed=img.get("processed", False),
-                    public_id=img.get("public_id"),
-                    folder_id=img.get("folder_id")
-                )
-            )
-
-        return {
+        # Seek past the cursor when one is given, otherwise skip to the page
+        cursor_filter = {}
+        if after:
+            try:
+                cursor_filter = keyset_filter(after, sort_field, sort_direction)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        # One extra row tells whether there is a next page
+        total, results = await fetch_image_page(
+            query, cursor_filter, sort_keys,
+            0 if after else (page - 1) * limit, limit + 1,
+            {**BUCKET_IMAGE_PROJECTION, sort_field: 1}, vendor_id)
+        results, cursor = page_cursor(results, limit, sort_field)
+
+        # Shape results as ImageMetadata dicts; returning the response
+        # directly skips a second validation pass through Pydantic
+        now = datetime.now(timezone.utc)
+        images = [{
+            "id": str(img["_id"]),
+            "title": img.get("filename", "Untitled"),
+            "description": img.get("description"),
+            "tags": img.get("tags", []),
+            "category": img.get("category"),
+            "uploadedAt": img.get("created_at", now),
+            "size": img.get("size", 0),
+            "dimensions": img.get("dimensions", {"width": 0, "height": 0}),
+            "format": img.get("format", "unknown"),
+            "url": img.get("url"),
+            "thumbnailUrl": img.get("thumbnailUrl"),
+            "isPublic": img.get("isPublic", False),
+            "vendor_id": img.get("vendor_id"),
+            "processed": img.get("processed", False),
+            "public_id": img.get("public_id"),
+            "folder_id": img.get("folder_id"),
+        } for img in results]
+
+        body = MongoJSONResponse(content={
             "images": images,
-            "total": total
-        }
+            "total": total,
+            "next_cursor": cursor
+        }).body
+        return etag_response(request, body, BUCKET_CACHE_CONTROL)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error fetching bucket images: {str(e)}")
+        logger.error("Error fetching bucket images: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to fetch images: {str(e)}")
 
@@ -291,63 +680,56 @@ async def upload_image(
     Upload a new image to the vendor's bucket
     """
     try:
-        init_mongodb()
-        init_cloudinary()
-
         # Parse metadata from JSON string
         meta_dict = json.loads(metadata)
 
-        # Read image file
-        image_data = await image.read()
-        image_size = len(image_data)
-
         # Generate a unique hash for the image
         image_hash = str(uuid.uuid4())
-        temp_path = os.path.join(settings.TEMP_DIR, f"input_{image_hash}.png")
 
-        # Process image if background removal is requested
+        # Process image if background removal is requested; only then are
+        # the bytes needed in memory
         if remove_bg:
-            processed_data = await remove_background(image_data, image_hash)
-            with open(temp_path, "wb") as f:
-                f.write(processed_data)
+            image_data = await read_upload(image)
+            image_size = len(image_data)
+            upload_data = await remove_background(
+                image_data, content_hash(image_data))
+
+            # Keep a copy on disk only when debugging with KEEP_TEMP_FILES
+            if settings.KEEP_TEMP_FILES:
+                await asyncio.to_thread(
+                    write_temp_file,
+                    os.path.join(settings.TEMP_DIR, f"input_{image_hash}.png"),
+                    upload_data)
         else:
-            with open(temp_path, "wb") as f:
-                f.write(image_data)
-
-        # Upload to Cloudinary
-        upload_result = cloudinary.uploader.upload(
-            temp_path,
+            # Pass-through: hand Cloudinary the spooled upload itself
+            image_size = upload_size(image)
+            await image.seek(0)
+            upload_data = image.file
+
+        # Upload once; Cloudinary derives the thumbnail as an eager
+        # transformation of the same asset
+        upload_result = await call_cloudinary(
+            cloudinary.uploader.upload,
+            upload_data,
             public_id=f"vendor_{vendor_id}_{image_hash}",
             overwrite=True,
             resource_type="image",
             format="png",
             quality="auto:best",
             fetch_format="png",
-            transformation=[{"flags": "preserve_transparency"}]
-        )
-
-        # Create thumbnail
-        thumbnail_result = cloudinary.uploader.upload(
-            temp_path,
-            public_id=f"vendor_{vendor_id}_{image_hash}_thumb",
-            overwrite=True,
-            resource_type="image",
-            format="png",
-            quality="auto:good",
-            fetch_format="png",
-            transformation=[
-                {"width": 200, "height": 200, "crop": "fill"},
-                {"flags": "preserve_transparency"}
-            ]
+            transformation=[{"flags": "preserve_transparency"}],
+            eager=[{
+                "width": 200, "height": 200, "crop": "fill",
+                "flags": "preserve_transparency",
+                "quality": "auto:good", "format": "png"
+            }],
+            eager_async=False
         )
-
-        # Clean up temp file
-        if os.path.exists(temp_path) and not settings.KEEP_TEMP_FILES:
-            os.remove(temp_path)
+        eager = upload_result.get("eager") or [{}]
 
         # Create image document
-        image_id = str(ObjectId())
-        now = datetime.now().isoformat()
+        image_id = ObjectId()
+        now = datetime.now(timezone.utc)
 
         # Get image dimensions (can be extracted from Cloudinary response)
         width = upload_result.get("width", 0)
@@ -355,7 +737,7 @@ async def upload_image(
 
         # Create the image metadata document
         image_doc = {
-            "_id": ObjectId(image_id),
+            "_id": image_id,
             "title": meta_dict.get("title", image.filename),
             "description": meta_dict.get("description", ""),
             "tags": meta_dict.get("tags", []),
@@ -368,6 +750,7 @@ async def upload_image(
             },
             "format": "png",  # Assuming PNG format
             "url": upload_result["secure_url"],
+            "thumbnailUrl": eager[0].get("secure_url"),
             "isPublic": meta_dict.get("isPublic", False),
             "vendor_id": vendor_id,
             "processed": remove_bg,
@@ -378,28 +761,15 @@ async def upload_image(
         }
 
         # Insert into MongoDB
-        db.images_collection.insert_one(image_doc)
+        await db.images_collection.insert_one(image_doc)
+        invalidate_image_caches(vendor_id)
 
         # Return the created image metadata
-        return ImageMetadata(
-            id=image_id,
-            title=image_doc["title"],
-            description=image_doc["description"],
-            tags=image_doc["tags"],
-            category=image_doc["category"],
-            uploadedAt=image_doc["uploadedAt"],
-            size=image_doc["size"],
-            dimensions=image_doc["dimensions"],
-            format=image_doc["format"],
-            url=image_doc["url"],
-            isPublic=image_doc["isPublic"],
-            vendor_id=image_doc["vendor_id"],
-            processed=image_doc["processed"],
-            public_id=image_doc["public_id"],
-            folder_id=image_doc["folder_id"]
-        )
+        return to_image_metadata(image_doc)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error uploading image: {str(e)}")
+        logger.error("Error uploading image: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to upload image: {str(e)}")
 
@@ -412,11 +782,10 @@ async def add_to_bucket(
     """
     Add an existing image to the vendor's bucket
     """
+    oid = parse_object_id(imageId, "Invalid image ID format")
     try:
-        init_mongodb()
-
         # Find the image
-        image = db.images_collection.find_one({"_id": ObjectId(imageId)})
+        image = await db.images_collection.find_one({"_id": oid})
         if not image:
             raise HTTPException(status_code=404, detail="Image not found")
 
@@ -427,28 +796,15 @@ async def add_to_bucket(
         image_copy["_id"] = ObjectId()
 
         # Insert the copy
-        db.images_collection.insert_one(image_copy)
+        await db.images_collection.insert_one(image_copy)
+        invalidate_image_caches(vendor_id)
 
         # Return the added image
-        return ImageMetadata(
-            id=str(image_copy["_id"]),
-            title=image_copy.get("title", "Untitled"),
-            description=image_copy.get("description"),
-            tags=image_copy.get("tags", []),
-            category=image_copy.get("category"),
-            uploadedAt=image_copy.get("uploadedAt", datetime.now()),
-            size=image_copy.get("size", 0),
-            dimensions=image_copy.get("dimensions", {"width": 0, "height": 0}),
-            format=image_copy.get("format", "unknown"),
-            url=image_copy.get("url"),
-            isPublic=image_copy.get("isPublic", False),
-            vendor_id=image_copy.get("vendor_id"),
-            processed=image_copy.get("processed", False),
-            public_id=image_copy.get("public_id"),
-            folder_id=image_copy.get("folder_id")
-        )
+        return to_image_metadata(image_copy)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error adding image to bucket: {str(e)}")
+        logger.error("Error adding image to bucket: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to add image to bucket: {str(e)}")
 
@@ -461,34 +817,30 @@ async def remove_from_bucket(
     """
     Remove an image from the vendor's bucket
     """
+    oid = parse_object_id(imageId, "Invalid image ID format")
     try:
-        init_mongodb()
-        init_cloudinary()
-
         # Find the image
-        image = db.images_collection.find_one(
-            {"_id": ObjectId(imageId), "vendor_id": vendor_id})
+        image = await db.images_collection.find_one(
+            {"_id": oid, "vendor_id": vendor_id},
+            {"public_id": 1, "thumbnailUrl": 1})
         if not image:
             raise HTTPException(
                 status_code=404, detail="Image not found or not owned by this vendor")
 
-        # Delete the image from Cloudinary
+        deletes = [db.images_collection.delete_one(
+            {"_id": oid, "vendor_id": vendor_id})]
         if "public_id" in image:
-            cloudinary.uploader.destroy(
-                image["public_id"], resource_type="image")
-
-        # Delete the thumbnail from Cloudinary if it exists
-        if "public_id" in image and not image["public_id"].endswith("_thumb"):
-            cloudinary.uploader.destroy(
-                f"{image['public_id']}_thumb", resource_type="image")
+            deletes.append(delete_image_assets(image))
 
-        # Delete from MongoDB
-        db.images_collection.delete_one(
-            {"_id": ObjectId(imageId), "vendor_id": vendor_id})
+        # Delete from MongoDB and Cloudinary together
+        await asyncio.gather(*deletes)
+        invalidate_image_caches(vendor_id)
 
         return {"message": "Image removed successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error removing image from bucket: {str(e)}")
+        logger.error("Error removing image from bucket: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to remove image: {str(e)}")
 
@@ -502,12 +854,11 @@ async def update_image_metadata(
     """
     Update image metadata
     """
+    oid = parse_object_id(imageId, "Invalid image ID format")
     try:
-        init_mongodb()
-
         # Find the image
-        image = db.images_collection.find_one(
-            {"_id": ObjectId(imageId), "vendor_id": vendor_id})
+        image = await db.images_collection.find_one(
+            {"_id": oid, "vendor_id": vendor_id}, {"_id": 1})
         if not image:
             raise HTTPException(
                 status_code=404, detail="Image not found or not owned by this vendor")
@@ -519,36 +870,22 @@ async def update_image_metadata(
                        if k in allowed_fields}
 
         # Update in MongoDB
-        db.images_collection.update_one(
-            {"_id": ObjectId(imageId), "vendor_id": vendor_id},
+        await db.images_collection.update_one(
+            {"_id": oid, "vendor_id": vendor_id},
             {"$set": update_data}
         )
+        invalidate_image_caches(vendor_id)
 
         # Get the updated image
-        updated_image = db.images_collection.find_one(
-            {"_id": ObjectId(imageId)})
+        updated_image = await db.images_collection.find_one(
+            {"_id": oid})
 
         # Return the updated image metadata
-        return ImageMetadata(
-            id=str(updated_image["_id"]),
-            title=updated_image.get("title", "Untitled"),
-            description=updated_image.get("description"),
-            tags=updated_image.get("tags", []),
-            category=updated_image.get("category"),
-            uploadedAt=updated_image.get("uploadedAt", datetime.now()),
-            size=updated_image.get("size", 0),
-            dimensions=updated_image.get(
-                "dimensions", {"width": 0, "height": 0}),
-            format=updated_image.get("format", "unknown"),
-            url=updated_image.get("url"),
-            isPublic=updated_image.get("isPublic", False),
-            vendor_id=updated_image.get("vendor_id"),
-            processed=updated_image.get("processed", False),
-            public_id=updated_image.get("public_id"),
-            folder_id=updated_image.get("folder_id")
-        )
+        return to_image_metadata(updated_image)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error updating image metadata: {str(e)}")
+        logger.error("Error updating image metadata: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to update image metadata: {str(e)}")
 
@@ -562,13 +899,11 @@ async def process_image(
     """
     Process an image (resize, convert format, etc.)
     """
+    oid = parse_object_id(imageId, "Invalid image ID format")
     try:
-        init_mongodb()
-        init_cloudinary()
-
         # Find the image
-        image = db.images_collection.find_one(
-            {"_id": ObjectId(imageId), "vendor_id": vendor_id})
+        image = await db.images_collection.find_one(
+            {"_id": oid, "vendor_id": vendor_id})
         if not image:
             raise HTTPException(
                 status_code=404, detail="Image not found or not owned by this vendor")
@@ -603,7 +938,8 @@ async def process_image(
         # Process the image
         format_option = options.format if options.format else "png"
 
-        result = cloudinary.uploader.explicit(
+        result = await call_cloudinary(
+            cloudinary.uploader.explicit,
             public_id,
             type="upload",
             resource_type="image",
@@ -617,8 +953,8 @@ async def process_image(
         processed_url = result["eager"][0]["secure_url"]
 
         # Create a new image entry for the processed image
-        new_image_id = str(ObjectId())
-        now = datetime.now().isoformat()
+        new_image_id = ObjectId()
+        now = datetime.now(timezone.utc)
 
         # Create a new public ID for the processed image
         new_public_id = f"{public_id}_processed_{uuid.uuid4().hex[:8]}"
@@ -630,7 +966,7 @@ async def process_image(
 
         # Create the new image metadata
         new_image = {
-            "_id": ObjectId(new_image_id),
+            "_id": new_image_id,
             "title": f"{image.get('title', 'Untitled')} (Processed)",
             "description": image.get("description", ""),
             "tags": image.get("tags", []),
@@ -653,74 +989,312 @@ async def process_image(
         }
 
         # Insert into MongoDB
-        db.images_collection.insert_one(new_image)
+        await db.images_collection.insert_one(new_image)
+        invalidate_image_caches(vendor_id)
 
         # Return the processed image metadata
-        return ImageMetadata(
-            id=new_image_id,
-            title=new_image["title"],
-            description=new_image["description"],
-            tags=new_image["tags"],
-            category=new_image["category"],
-            uploadedAt=new_image["uploadedAt"],
-            size=new_image["size"],
-            dimensions=new_image["dimensions"],
-            format=new_image["format"],
-            url=new_image["url"],
-            isPublic=new_image["isPublic"],
-            vendor_id=new_image["vendor_id"],
-            processed=new_image["processed"],
-            public_id=new_image["public_id"],
-            folder_id=new_image["folder_id"]
-        )
+        return to_image_metadata(new_image)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error processing image: {str(e)}")
+        logger.error("Error processing image: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to process image: {str(e)}")
 
 
 @app.get("/api/seller/image-bucket/filters", response_model=FilterOptions)
 async def get_filter_options(
+    request: Request,
     vendor_id: str = Query(..., description="Vendor ID")
 ):
     """
     Get available filter options for the vendor's bucket
     """
+    cached = filter_cache.get(vendor_id)
+    if cached is not None:
+        return etag_response(request, cached, LISTING_CACHE_CONTROL)
+
     try:
-        init_mongodb()
-
-        # Get unique categories
-        categories = db.images_collection.distinct(
-            "category", {"vendor_id": vendor_id})
-        categories = [c for c in categories if c]
-
-        # Get unique tags
-        all_tags = []
-        tag_cursor = db.images_collection.find(
-            {"vendor_id": vendor_id, "tags": {"$exists": True}}, {"tags": 1})
-        for doc in tag_cursor:
-            all_tags.extend(doc.get("tags", []))
-        tags = list(set(all_tags))
-
-        # Get unique formats
-        formats = db.images_collection.distinct(
-            "format", {"vendor_id": vendor_id})
-        formats = [f for f in formats if f]
-
-        return FilterOptions(
-            categories=categories,
-            tags=tags,
-            formats=formats
+        # Unique categories, tags and formats, deduplicated by Mongo;
+        # distinct on the tags array returns its individual elements
+        query = {"vendor_id": vendor_id}
+        categories, tags, formats = await asyncio.gather(
+            db.images_collection.distinct("category", query),
+            db.images_collection.distinct("tags", query),
+            db.images_collection.distinct("format", query)
         )
+
+        body = orjson.dumps(FilterOptions(
+            categories=[c for c in categories if c],
+            tags=[t for t in tags if t],
+            formats=[f for f in formats if f]
+        ).model_dump())
+        filter_cache[vendor_id] = body
+        return etag_response(request, body, LISTING_CACHE_CONTROL)
     except Exception as e:
-        logger.error(f"Error fetching filter options: {str(e)}")
+        logger.error("Error fetching filter options: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to fetch filter options: {str(e)}")
 
 
+async def process_vendor_upload(file: UploadFile, vendor_id: str, remove_bg: bool,
+                                folder_id: Optional[str]) -> Dict[str, Any]:
+    """
+    Read an upload, optionally remove its background, push it to Cloudinary
+    and return the image document to store
+    """
+    upload_id = str(uuid.uuid4())
+
+    if remove_bg:
+        image_data = await read_upload(file)
+        image_size = len(image_data)
+        logger.debug("Original image size: %.2fKB", image_size / 1024)
+
+        # Content hash keys the processing cache; the UUID keeps public IDs unique
+        result = await remove_background(image_data, content_hash(image_data))
+        logger.debug("Image processing completed")
+
+        # Hand the bytes to Cloudinary directly instead of via a temp file
+        upload_source = BytesIO(result)
+        source_size = len(result)
+        is_png = result[:8] == PNG_SIGNATURE
+    else:
+        # Pass-through: give Cloudinary the spooled upload itself rather than
+        # copying it into a bytes object first
+        image_size = upload_size(file)
+        logger.debug("Original image size: %.2fKB", image_size / 1024)
+        await file.seek(0)
+        is_png = await file.read(len(PNG_SIGNATURE)) == PNG_SIGNATURE
+        await file.seek(0)
+        upload_source = file.file
+        source_size = image_size
+
+    # Only PNGs can carry transparency worth preserving
+    upload_name = f"{upload_id}.png" if is_png else (
+        f"{upload_id}{os.path.splitext(file.filename or '')[1]}")
+
+    upload_options = {
+        "public_id": f"vendor_{vendor_id}_{upload_id}",
+        "filename": upload_name,
+        "overwrite": True,
+        "resource_type": "image",
+        "quality": "auto",
+        "transformation": [{"quality": "auto:good"}]
+    }
+    if remove_bg or is_png:
+        # Upload optimized image with automatic modern format conversion
+        upload_options.update(
+            format="webp",
+            fetch_format="auto",  # Serve best format to each browser
+            transformation=[
+                {"flags": "preserve_transparency"},
+                {"quality": "auto:good"}
+            ]
+        )
+    # Other pass-through uploads keep their original format, which
+    # avoids a server-side re-encode of e.g. JPEGs
+
+    # Large files go up in chunks, read from the source as they are sent
+    if source_size > settings.CLOUDINARY_CHUNK_SIZE:
+        upload_result = await call_cloudinary(
+            cloudinary.uploader.upload_large, upload_source,
+            chunk_size=settings.CLOUDINARY_CHUNK_SIZE, **upload_options)
+    else:
+        upload_result = await call_cloudinary(
+            cloudinary.uploader.upload, upload_source, **upload_options)
+    logger.debug("Uploaded optimized image to Cloudinary")
+
+    # Create comprehensive image metadata with all optimized versions
+    now = datetime.now(timezone.utc)
+    return {
+        "_id": ObjectId(),
+        "title": file.filename,
+        "description": None,
+        "tags": [],
+        "category": None,
+        "uploadedAt": now,
+        "size": image_size,
+        "dimensions": {
+            "width": upload_result.get("width", 0),
+            "height": upload_result.get("height", 0)
+        },
+        "format": upload_result.get("format", "auto"),
+        "url": upload_result["secure_url"],
+
+        "isPublic": False,
+        "vendor_id": vendor_id,
+        "processed": remove_bg,
+        "public_id": upload_result["public_id"],
+        "folder_id": folder_id,
+        "filename": file.filename,
+        "created_at": now
+    }
+
+
+def vendor_upload_response(image_doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Response body for a stored vendor upload
+    """
+    return {
+        "id": str(image_doc["_id"]),
+        "title": image_doc["title"],
+        "description": image_doc["description"],
+        "tags": image_doc["tags"],
+        "category": image_doc["category"],
+        "uploadedAt": image_doc["uploadedAt"].isoformat(),
+        "size": image_doc["size"],
+        "dimensions": image_doc["dimensions"],
+        "format": image_doc["format"],
+        "url": image_doc["url"],
+        "isPublic": image_doc["isPublic"],
+        "vendor_id": image_doc["vendor_id"],
+        "processed": image_doc["processed"],
+        "public_id": image_doc["public_id"],
+        "folder_id": image_doc["folder_id"]
+    }
+
+
+async def run_upload_job(job_id: ObjectId, file: UploadFile, vendor_id: str,
+                         remove_bg: bool, folder_id: Optional[str]) -> None:
+    """
+    Process and store a queued upload, recording the outcome on its job
+    """
+    try:
+        await db.jobs_collection.update_one(
+            {"_id": job_id}, {"$set": {"status": "processing"}})
+        image_doc = await process_vendor_upload(
+            file, vendor_id, remove_bg, folder_id)
+        await db.images_collection.insert_one(image_doc)
+        invalidate_image_caches(vendor_id)
+        await db.jobs_collection.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "done",
+                      "image": vendor_upload_response(image_doc)}})
+        logger.info(
+            "Upload job %s stored image %s for vendor %s",
+            job_id, image_doc["_id"], vendor_id)
+    except asyncio.CancelledError:
+        await db.jobs_collection.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "failed", "error": "Interrupted by server shutdown"}})
+        raise
+    except Exception as e:
+        logger.error("Upload job %s failed: %s", job_id, e)
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        await db.jobs_collection.update_one(
+            {"_id": job_id}, {"$set": {"status": "failed", "error": detail}})
+
+
+async def fail_stale_upload_jobs() -> int:
+    """
+    Mark jobs left queued or processing by a process that went away as failed
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.UPLOAD_JOB_STALE_AFTER)
+    result = await db.jobs_collection.update_many(
+        {"status": {"$in": ["queued", "processing"]}, "created_at": {"$lt": cutoff}},
+        {"$set": {"status": "failed", "error": "Interrupted by a server restart"}})
+    return result.modified_count
+
+
+def parse_object_id(value: str, detail: str) -> ObjectId:
+    """
+    Parse an ObjectId from a request value, answering 400 when it is malformed
+    """
+    if not ObjectId.is_valid(value):
+        raise HTTPException(status_code=400, detail=detail)
+    return ObjectId(value)
+
+
+async def vendor_owns_folder(folder_oid: ObjectId, vendor_id: str) -> bool:
+    """
+    Check folder ownership, skipping MongoDB for recently verified pairs
+    """
+    key = (vendor_id, folder_oid)
+    if key in verified_folders:
+        return True
+    folder = await db.folders_collection.find_one(
+        {"_id": folder_oid, "vendor_id": vendor_id}, {"_id": 1})
+    if folder:
+        verified_folders[key] = True
+    return folder is not None
+
+
+def find_vendor_folder(folder_id: Optional[str], vendor_id: str):
+    """
+    Start the folder ownership lookup, or return None when no folder is given
+    """
+    if not folder_id:
+        return None
+    folder_oid = parse_object_id(folder_id, "Invalid folder_id")
+    return asyncio.create_task(vendor_owns_folder(folder_oid, vendor_id))
+
+
+async def queue_vendor_upload(file: UploadFile, vendor_id: str, remove_bg: bool,
+                              folder_id: Optional[str]) -> MongoJSONResponse:
+    """
+    Validate and buffer an upload, then hand it to a background job
+    """
+    # Every pending job holds its upload in memory, so their number is capped
+    if upload_job_slots.locked():
+        raise HTTPException(
+            status_code=503, detail="Too many pending uploads, retry later",
+            headers={"Retry-After": "5"})
+    await upload_job_slots.acquire()
+    try:
+        folder_task = find_vendor_folder(folder_id, vendor_id)
+        if folder_task and not await folder_task:
+            raise HTTPException(
+                status_code=404, detail="Folder not found or unauthorized")
+
+        # The request's spooled file is closed once the response is sent
+        data = await read_upload(file)
+        buffered = UploadFile(
+            file=BytesIO(data), size=len(data), filename=file.filename)
+
+        job_id = ObjectId()
+        await db.jobs_collection.insert_one({
+            "_id": job_id,
+            "vendor_id": vendor_id,
+            "filename": file.filename,
+            "status": "queued",
+            "created_at": datetime.now(timezone.utc)
+        })
+    except BaseException:
+        upload_job_slots.release()
+        raise
+    task = asyncio.create_task(
+        run_upload_job(job_id, buffered, vendor_id, remove_bg, folder_id))
+    upload_jobs.add(task)
+    task.add_done_callback(upload_jobs.discard)
+    task.add_done_callback(lambda _: upload_job_slots.release())
+
+    logger.debug("Queued upload job %s for vendor %s", job_id, vendor_id)
+    return MongoJSONResponse(
+        content={"job_id": str(job_id), "status": "queued"},
+        status_code=202
+    )
+
+
+@app.get("/jobs/{job_id}")
+async def get_upload_job(
+    job_id: str,
+    vendor_id: str = Query(..., description="Vendor ID the upload was queued for")
+):
+    """
+    Status of a queued upload; includes the stored image once done
+    """
+    oid = parse_object_id(job_id, "Invalid job ID format")
+    # Other vendors' jobs are reported as missing
+    job = await db.jobs_collection.find_one({"_id": oid, "vendor_id": vendor_id})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job["id"] = str(job.pop("_id"))
+    return job
+
+
 @app.post("/remove-background")
 async def remove_background_endpoint(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     vendor_id: str = Query(...,
                            description="Vendor ID to associate with the image"),
@@ -728,225 +1302,257 @@ async def remove_background_endpoint(
         False, description="Whether to remove the background"),
     folder_id: str = Query(
         None, description="Folder ID to store the image in (optional)"),
+    background: bool = Query(
+        False, description="Queue the upload and return 202 with a job ID to poll"),
 ):
     logger.debug(
-        f"Received request to /remove-background for vendor {vendor_id}, remove_bg={remove_bg}, folder_id={folder_id}")
+        "Received request to /remove-background for vendor %s, remove_bg=%s, folder_id=%s",
+        vendor_id, remove_bg, folder_id)
+    if background:
+        return await queue_vendor_upload(file, vendor_id, remove_bg, folder_id)
     try:
         start_time = time.time()
-        image_data = await file.read()
-        image_size = len(image_data)
-        logger.debug(f"Original image size: {image_size/1024:.2f}KB")
-
-        image_hash = str(uuid.uuid4())
-        temp_path = os.path.join(settings.TEMP_DIR, f"input_{image_hash}.png")
 
-        # Process the image if background removal is requested
-        result = image_data if not remove_bg else await remove_background(image_data, image_hash)
-        logger.debug("Image processing completed")
-
-        # Save the processed image temporarily
-        with open(temp_path, "wb") as f:
-            f.write(result)
-        logger.debug(f"Saved temporary image to {temp_path}")
-
-        # Initialize Cloudinary and MongoDB if not already initialized
-        init_cloudinary()
-        init_mongodb()
-
-        # Upload optimized image with automatic modern format conversion
-        upload_result = cloudinary.uploader.upload(
-            temp_path,
-            public_id=f"vendor_{vendor_id}_{image_hash}",
-            overwrite=True,
-            resource_type="image",
-            format="webp",
-            quality="auto",
-            fetch_format="auto",  # Serve best format to each browser
-            transformation=[
-                {"flags": "preserve_transparency"},
-                {"quality": "auto:good"}
-            ]
-        )
-        logger.debug("Uploaded optimized image to Cloudinary")
+        # Start the folder lookup now so it overlaps with processing and upload
+        folder_task = find_vendor_folder(folder_id, vendor_id)
+        upload_task = process_vendor_upload(file, vendor_id, remove_bg, folder_id)
 
-        # Clean up temporary file
-        background_tasks.add_task(cleanup_temp_files, temp_path)
-        logger.debug(f"Scheduled cleanup for {temp_path}")
+        # Wait for the upload and the folder lookup together
+        if folder_task:
+            image_doc, folder = await asyncio.gather(upload_task, folder_task)
+        else:
+            image_doc, folder = await upload_task, None
 
         # Validate folder_id if provided
         if folder_id:
-            try:
-                folder = db.folders_collection.find_one(
-                    {"_id": ObjectId(folder_id), "vendor_id": vendor_id})
-                if not folder:
-                    raise HTTPException(
-                        status_code=404, detail="Folder not found or unauthorized")
-                logger.debug(f"Validated folder_id {folder_id}")
-            except Exception as e:
-                logger.error(
-                    f"Error validating folder_id {folder_id}: {str(e)}")
+            if not folder:
+                # The upload already finished; don't leave an asset that no
+                # document points to
+                try:
+                    await call_cloudinary(
+                        cloudinary.uploader.destroy, image_doc["public_id"],
+                        resource_type="image")
+                except Exception as e:
+                    logger.warning(
+                        "Failed to destroy orphaned upload %s: %s",
+                        image_doc["public_id"], e)
                 raise HTTPException(
-                    status_code=400, detail=f"Invalid folder_id: {str(e)}")
-
-        # Create comprehensive image metadata with all optimized versions
-        now = datetime.utcnow()
-        image_doc = {
-            "_id": ObjectId(),
-            "title": file.filename,
-            "description": None,
-            "tags": [],
-            "category": None,
-            "uploadedAt": now,
-            "size": image_size,
-            "dimensions": {
-                "width": upload_result.get("width", 0),
-                "height": upload_result.get("height", 0)
-            },
-            "format": upload_result.get("format", "auto"),
-            "url": upload_result["secure_url"],
-
-            "isPublic": False,
-            "vendor_id": vendor_id,
-            "processed": remove_bg,
-            "public_id": upload_result["public_id"],
-            "folder_id": folder_id,
-            "filename": file.filename,
-            "created_at": now.isoformat()
-        }
+                    status_code=404, detail="Folder not found or unauthorized")
+            logger.debug("Validated folder_id %s", folder_id)
 
         # Store metadata in MongoDB
         try:
-            result = db.images_collection.insert_one(image_doc)
+            result = await db.images_collection.insert_one(image_doc)
+            invalidate_image_caches(vendor_id)
             image_id = str(result.inserted_id)
             logger.debug(
-                f"Stored metadata in MongoDB with image_id {image_id}")
+                "Stored metadata in MongoDB with image_id %s", image_id)
         except DuplicateKeyError as e:
             logger.error(
-                f"Failed to store metadata for {file.filename}: {str(e)}")
+                "Failed to store metadata for %s: %s", file.filename, e)
             raise HTTPException(
                 status_code=500, detail="Failed to store image metadata")
 
         processing_time = time.time() - start_time
 
         logger.info(
-            f"Optimized image for vendor {vendor_id}: {file.filename}, "
-            f"Original: {image_size/1024:.2f}KB, "
-            f"Time: {processing_time:.2f}s, "
-            f"Background Removed: {remove_bg}, "
-            f"Folder: {folder_id or 'None'}"
+            "Optimized image for vendor %s: %s, "
+            "Original: %.2fKB, "
+            "Time: %.2fs, "
+            "Background Removed: %s, "
+            "Folder: %s",
+            vendor_id, file.filename, image_doc["size"] / 1024,
+            processing_time, remove_bg, folder_id or "None"
         )
 
         # Return response with optimized URLs
-        return JSONResponse(
-            content={
-                "id": image_id,
-                "title": image_doc["title"],
-                "description": image_doc["description"],
-                "tags": image_doc["tags"],
-                "category": image_doc["category"],
-                "uploadedAt": image_doc["uploadedAt"].isoformat(),
-                "size": image_doc["size"],
-                "dimensions": image_doc["dimensions"],
-                "format": image_doc["format"],
-                "url": image_doc["url"],
-                "isPublic": image_doc["isPublic"],
-                "vendor_id": image_doc["vendor_id"],
-                "processed": image_doc["processed"],
-                "public_id": image_doc["public_id"],
-                "folder_id": image_doc["folder_id"]
-            },
+        return MongoJSONResponse(
+            content=vendor_upload_response(image_doc),
             status_code=200,
             media_type="application/json"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
-            f"Error processing {file.filename} for vendor {vendor_id}: {str(e)}")
-        return JSONResponse(
+            "Error processing %s for vendor %s: %s", file.filename, vendor_id, e)
+        return MongoJSONResponse(
             status_code=500,
             content={"error": f"Failed to process image: {str(e)}"}
         )
 
 
+@app.post("/remove-background-batch")
+async def remove_background_batch(
+    files: List[UploadFile] = File(...),
+    vendor_id: str = Query(...,
+                           description="Vendor ID to associate with the images"),
+    remove_bg: bool = Query(
+        False, description="Whether to remove the background"),
+    folder_id: str = Query(
+        None, description="Folder ID to store the images in (optional)"),
+):
+    """
+    Upload several images in one request and store their metadata in a single insert
+    """
+    logger.debug(
+        "Received %s files on /remove-background-batch for vendor %s, remove_bg=%s, folder_id=%s",
+        len(files), vendor_id, remove_bg, folder_id)
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_BATCH_FILES} files per batch")
+    try:
+        start_time = time.time()
+
+        # Check the folder before doing any uploads for it
+        folder_task = find_vendor_folder(folder_id, vendor_id)
+        if folder_task and not await folder_task:
+            raise HTTPException(
+                status_code=404, detail="Folder not found or unauthorized")
+
+        # Background removal is still bounded by the processing semaphore
+        results = await asyncio.gather(
+            *[process_vendor_upload(f, vendor_id, remove_bg, folder_id) for f in files],
+            return_exceptions=True
+        )
+
+        image_docs = []
+        errors = []
+        for upload, result in zip(files, results):
+            if isinstance(result, Exception):
+                detail = result.detail if isinstance(
+                    result, HTTPException) else str(result)
+                logger.error(
+                    "Error processing %s for vendor %s: %s", upload.filename, vendor_id, detail)
+                errors.append({"filename": upload.filename, "error": detail})
+            else:
+                image_docs.append(result)
+
+        # One round trip for all metadata; unordered so one bad doc doesn't stop the rest
+        if image_docs:
+            try:
+                await db.images_collection.insert_many(image_docs, ordered=False)
+            except BulkWriteError as e:
+                # The other documents were stored; report the failed ones and
+                # destroy their uploads, which no document points to
+                failed = {err["index"]: err.get("errmsg")
+                          for err in e.details.get("writeErrors", [])}
+                for index, message in failed.items():
+                    doc = image_docs[index]
+                    logger.error(
+                        "Failed to store metadata for %s: %s", doc["filename"], message)
+                    errors.append({"filename": doc["filename"],
+                                   "error": "Failed to store image metadata"})
+                await asyncio.gather(
+                    *[delete_image_assets(image_docs[index]) for index in failed],
+                    return_exceptions=True)
+                image_docs = [doc for index, doc in enumerate(image_docs)
+                              if index not in failed]
+            invalidate_image_caches(vendor_id)
+
+        logger.info(
+            "Batch for vendor %s: %s stored, %s failed, Time: %.2fs",
+            vendor_id, len(image_docs), len(errors), time.time() - start_time)
+
+        return MongoJSONResponse(
+            content={
+                "images": [vendor_upload_response(doc) for doc in image_docs],
+                "errors": errors
+            },
+            status_code=200
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(
+            "Error processing batch for vendor %s: %s", vendor_id, e)
+        return MongoJSONResponse(
+            status_code=500,
+            content={"error": f"Failed to process images: {str(e)}"}
+        )
+
+
+def image_list_projection(sort_field: str) -> Dict[str, Any]:
+    """
+    IMAGE_LIST_STAGE's projection plus the raw sort value under SORT_KEY;
+    cursors must hold the value $sort saw, not the $ifNull default
+    """
+    return {**IMAGE_LIST_STAGE["$project"], SORT_KEY: f"${sort_field}"}
+
+
+def parse_uploaded_at(img: Dict[str, Any]) -> datetime:
+    """
+    Upload time of an image document, tolerating legacy string or missing values
+    """
+    uploaded_at = img.get("uploadedAt") or img.get("created_at")
+    if isinstance(uploaded_at, str):
+        try:
+            uploaded_at = datetime.fromisoformat(
+                uploaded_at.replace('Z', '+00:00'))
+        except ValueError:
+            uploaded_at = None
+    return uploaded_at or datetime.now(timezone.utc)
+
+
+def image_list_row(img: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    ImageMetadata fields of a document shaped by IMAGE_LIST_STAGE
+    """
+    row = {field: img.get(field) for field in IMAGE_METADATA_FIELDS}
+    row["uploadedAt"] = parse_uploaded_at(img)
+    return row
+
+
 @app.get("/vendor-images/{vendor_id}", response_model=PaginatedImageMetadata)
 async def get_vendor_images(
     vendor_id: str,
     page: int = Query(1, description="Page number", ge=1),
     limit: int = Query(50, description="Results per page", ge=1, le=100),
-    sortBy: str = Query("uploadedAt", description="Sort by field"),
-    sortOrder: str = Query("desc", description="Sort order (asc or desc)")
+    sortBy: ImageSortField = Query("uploadedAt", description="Sort by field"),
+    sortOrder: str = Query("desc", description="Sort order (asc or desc)"),
+    after: Optional[str] = Query(
+        None, description="Cursor from a previous page; overrides page")
 ):
     """
     Get all images for a vendor with pagination and sorting
     """
     try:
-        init_mongodb()
-
         # Build the query
         query = {"vendor_id": vendor_id}
 
-        # Get total count
-        total = db.images_collection.count_documents(query)
-
         # Set up sorting
         sort_direction = -1 if sortOrder == "desc" else 1
         sort_field = sortBy
 
-        # Get paginated results
-        results = list(db.images_collection.find(query)
-                       .sort(sort_field, sort_direction)
-                       .skip((page - 1) * limit)
-                       .limit(limit))
-
-        # Transform results to match frontend expected type
-        images = []
-        for img in results:
-            # Handle uploadedAt field
-            uploaded_at = img.get("uploadedAt")
-            if uploaded_at is None:
-                # If uploadedAt is None, try to use created_at or current time
-                uploaded_at = img.get("created_at")
-                if uploaded_at is None:
-                    uploaded_at = datetime.utcnow()
-                elif isinstance(uploaded_at, str):
-                    try:
-                        uploaded_at = datetime.fromisoformat(
-                            uploaded_at.replace('Z', '+00:00'))
-                    except ValueError:
-                        uploaded_at = datetime.utcnow()
-            elif isinstance(uploaded_at, str):
-                try:
-                    uploaded_at = datetime.fromisoformat(
-                        uploaded_at.replace('Z', '+00:00'))
-                except ValueError:
-                    uploaded_at = datetime.utcnow()
-
-            # Create image metadata with proper datetime handling
-            image_metadata = ImageMetadata(
-                id=str(img["_id"]),
-                title=img.get("title", "Untitled"),
-                description=img.get("description"),
-                tags=img.get("tags", []),
-                category=img.get("category"),
-                uploadedAt=uploaded_at,
-                size=img.get("size", 0),
-                dimensions=img.get("dimensions", {"width": 0, "height": 0}),
-                format=img.get("format", "unknown"),
-                url=img.get("url"),
-                isPublic=img.get("isPublic", False),
-                vendor_id=img.get("vendor_id"),
-                processed=img.get("processed", False),
-                public_id=img.get("public_id"),
-                folder_id=img.get("folder_id")
-            )
-            images.append(image_metadata)
-
-        return {
-            "images": images,
-            "total": total
-        }
+        # Seek past the cursor when one is given, otherwise skip to the page
+        cursor_filter = {}
+        if after:
+            try:
+                cursor_filter = keyset_filter(after, sort_field, sort_direction)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        # The total is reused from count_cache between pages; one extra row
+        # tells whether there is a next page
+        total, results = await fetch_image_page(
+            query, cursor_filter,
+            {sort_field: sort_direction, "_id": sort_direction},
+            0 if after else (page - 1) * limit, limit + 1,
+            image_list_projection(sort_field), vendor_id)
+        results, cursor = page_cursor(results, limit, SORT_KEY)
+
+        # Rows are already shaped by IMAGE_LIST_STAGE, so they are encoded
+        # as-is instead of being re-validated against response_model
+        return MongoJSONResponse(content={
+            "images": [image_list_row(img) for img in results],
+            "total": total,
+            "next_cursor": cursor
+        })
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error fetching vendor images: {str(e)}")
+        logger.error("Error fetching vendor images: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch vendor images: {str(e)}"
@@ -959,89 +1565,60 @@ async def get_folder_images(
     folder_id: str,
     page: int = Query(1, description="Page number", ge=1),
     limit: int = Query(50, description="Results per page", ge=1, le=100),
-    sortBy: str = Query("uploadedAt", description="Sort by field"),
-    sortOrder: str = Query("desc", description="Sort order (asc or desc)")
+    sortBy: ImageSortField = Query("uploadedAt", description="Sort by field"),
+    sortOrder: str = Query("desc", description="Sort order (asc or desc)"),
+    after: Optional[str] = Query(
+        None, description="Cursor from a previous page; overrides page")
 ):
     """
     Get all images for a vendor in a specific folder with pagination and sorting
     """
     try:
-        init_mongodb()
+        oid = parse_object_id(folder_id, "Invalid folder_id")
 
-        # Validate folder exists and belongs to vendor
-        oid = ObjectId(folder_id)
-        folder = db.folders_collection.find_one(
-            {"_id": oid, "vendor_id": vendor_id})
-        if not folder:
-            raise HTTPException(
-                status_code=404, detail="Folder not found or unauthorized")
-
-        # Build the query
+        # Build the query; it is scoped to the vendor, so it can run
+        # alongside the folder ownership check
         query = {"vendor_id": vendor_id, "folder_id": str(oid)}
 
-        # Get total count
-        total = db.images_collection.count_documents(query)
-
         # Set up sorting
         sort_direction = -1 if sortOrder == "desc" else 1
         sort_field = sortBy
 
-        # Get paginated results
-        results = list(db.images_collection.find(query)
-                       .sort(sort_field, sort_direction)
-                       .skip((page - 1) * limit)
-                       .limit(limit))
-
-        # Transform results to match frontend expected type
-        images = []
-        for img in results:
-            # Handle uploadedAt field
-            uploaded_at = img.get("uploadedAt")
-            if uploaded_at is None:
-                # If uploadedAt is None, try to use created_at or current time
-                uploaded_at = img.get("created_at")
-                if uploaded_at is None:
-                    uploaded_at = datetime.utcnow()
-                elif isinstance(uploaded_at, str):
-                    try:
-                        uploaded_at = datetime.fromisoformat(
-                            uploaded_at.replace('Z', '+00:00'))
-                    except ValueError:
-                        uploaded_at = datetime.utcnow()
-            elif isinstance(uploaded_at, str):
-                try:
-                    uploaded_at = datetime.fromisoformat(
-                        uploaded_at.replace('Z', '+00:00'))
-                except ValueError:
-                    uploaded_at = datetime.utcnow()
-
-            # Create image metadata with proper datetime handling
-            image_metadata = ImageMetadata(
-                id=str(img["_id"]),
-                title=img.get("title", "Untitled"),
-                description=img.get("description"),
-                tags=img.get("tags", []),
-                category=img.get("category"),
-                uploadedAt=uploaded_at,
-                size=img.get("size", 0),
-                dimensions=img.get("dimensions", {"width": 0, "height": 0}),
-                format=img.get("format", "unknown"),
-                url=img.get("url"),
-                isPublic=img.get("isPublic", False),
-                vendor_id=img.get("vendor_id"),
-                processed=img.get("processed", False),
-                public_id=img.get("public_id"),
-                folder_id=img.get("folder_id")
-            )
-            images.append(image_metadata)
-
-        return {
-            "images": images,
-            "total": total
-        }
+        # Seek past the cursor when one is given, otherwise skip to the page
+        cursor_filter = {}
+        if after:
+            try:
+                cursor_filter = keyset_filter(after, sort_field, sort_direction)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        # Validate the folder while fetching the page (plus one row to tell
+        # whether there is a next page) and its total
+        owns_folder, (total, results) = await asyncio.gather(
+            vendor_owns_folder(oid, vendor_id),
+            fetch_image_page(
+                query, cursor_filter,
+                {sort_field: sort_direction, "_id": sort_direction},
+                0 if after else (page - 1) * limit, limit + 1,
+                image_list_projection(sort_field), vendor_id)
+        )
+        if not owns_folder:
+            raise HTTPException(
+                status_code=404, detail="Folder not found or unauthorized")
+        results, cursor = page_cursor(results, limit, SORT_KEY)
+
+        # Rows are already shaped by IMAGE_LIST_STAGE, so they are encoded
+        # as-is instead of being re-validated against response_model
+        return MongoJSONResponse(content={
+            "images": [image_list_row(img) for img in results],
+            "total": total,
+            "next_cursor": cursor
+        })
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error fetching folder images: {str(e)}")
+        logger.error("Error fetching folder images: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch folder images: {str(e)}"
@@ -1049,29 +1626,42 @@ async def get_folder_images(
 
 
 @app.get("/vendor-folders/{vendor_id}")
-async def get_vendor_folders(vendor_id: str):
-    logger.debug(f"Received request to /vendor-folders/{vendor_id}")
+async def get_vendor_folders(
+    vendor_id: str,
+    limit: int = Query(200, description="Folders per page", ge=1, le=1000),
+    after: Optional[str] = Query(
+        None, description="Cursor from a previous page"),
+):
+    logger.debug("Received request to /vendor-folders/%s", vendor_id)
     try:
-        init_mongodb()
-        folders = list(db.folders_collection.find({"vendor_id": vendor_id}))
-        serialized_folders = [
-            {
-                **folder,
-                "_id": str(folder["_id"]) if "_id" in folder else None,
-            }
-            for folder in folders
-        ]
+        # Folders are returned in creation (_id) order
+        query = {"vendor_id": vendor_id}
+        if after:
+            try:
+                query.update(keyset_filter(after, "_id", 1))
+            except ValueError as e:
+                return MongoJSONResponse(status_code=400, content={"error": str(e)})
+
+        # One extra row tells whether there is a next page
+        folders = await (db.folders_collection.find(query, FOLDER_LIST_PROJECTION)
+                         .sort("_id", 1)
+                         .limit(limit + 1)
+                         .batch_size(limit + 1)
+                         .to_list(length=limit + 1))
+        folders, cursor = page_cursor(folders, limit, "_id")
         logger.debug(
-            f"Found {len(serialized_folders)} folders for vendor {vendor_id}")
-        return JSONResponse(
-            content={"folders": serialized_folders},
+            "Found %s folders for vendor %s", len(folders), vendor_id)
+        # ObjectIds are serialized as strings by MongoJSONResponse
+        return MongoJSONResponse(
+            content={"folders": folders,
+                     "next_cursor": cursor},
             status_code=200,
             media_type="application/json"
         )
     except Exception as e:
         logger.error(
-            f"Error fetching folders for vendor {vendor_id}: {str(e)}")
-        return JSONResponse(
+            "Error fetching folders for vendor %s: %s", vendor_id, e)
+        return MongoJSONResponse(
             status_code=500,
             content={"error": f"Failed to fetch folders: {str(e)}"}
         )
@@ -1079,70 +1669,93 @@ async def get_vendor_folders(vendor_id: str):
 
 @app.post("/vendor-folders/{vendor_id}")
 async def create_vendor_folder(vendor_id: str, folder: Folder):
-    logger.debug(f"Received request to create folder for vendor {vendor_id}")
+    logger.debug("Received request to create folder for vendor %s", vendor_id)
     try:
-        init_mongodb()
-        folder_data = folder.dict(exclude={"_id"})
+        folder_data = folder.model_dump(exclude={"_id"})
         folder_data["vendor_id"] = vendor_id
-        folder_data["created_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
-        result = db.folders_collection.insert_one(folder_data)
+        # Native BSON date, stored as UTC
+        folder_data["created_at"] = datetime.now(timezone.utc)
+        try:
+            result = await db.folders_collection.insert_one(folder_data)
+        except DuplicateKeyError:
+            logger.debug(
+                "Folder %s already exists for vendor %s", folder.folder_name, vendor_id)
+            return MongoJSONResponse(
+                status_code=409,
+                content={"error": f"Folder '{folder.folder_name}' already exists"}
+            )
         folder_id = str(result.inserted_id)
         logger.debug(
-            f"Created folder with ID {folder_id} for vendor {vendor_id}")
-        return JSONResponse(
+            "Created folder with ID %s for vendor %s", folder_id, vendor_id)
+        return MongoJSONResponse(
             content={"folder_id": folder_id,
                      "folder_name": folder.folder_name, "vendor_id": vendor_id},
             status_code=201,
             media_type="application/json"
         )
     except Exception as e:
-        logger.error(f"Error creating folder for vendor {vendor_id}: {str(e)}")
-        return JSONResponse(
+        logger.error("Error creating folder for vendor %s: %s", vendor_id, e)
+        return MongoJSONResponse(
             status_code=500,
             content={"error": f"Failed to create folder: {str(e)}"}
         )
 
 
 @app.delete("/folders/{folder_id}")
-async def delete_folder(folder_id: str):
-    logger.debug(f"Received request to delete folder {folder_id}")
+async def delete_folder(
+    folder_id: str,
+    vendor_id: Optional[str] = Query(
+        None, description="Vendor ID; when given, the folder must belong to it")
+):
+    logger.debug("Received request to delete folder %s", folder_id)
     try:
-        init_mongodb()
-        oid = ObjectId(folder_id)
-        folder = db.folders_collection.find_one({"_id": oid})
+        # Existence and ownership are settled before anything is deleted
+        oid = parse_object_id(folder_id, "Invalid folder_id")
+        folder_query = {"_id": oid}
+        if vendor_id:
+            folder_query["vendor_id"] = vendor_id
+        folder = await db.folders_collection.find_one(folder_query, {"vendor_id": 1})
         if not folder:
             raise HTTPException(status_code=404, detail="Folder not found")
 
         vendor_id = folder["vendor_id"]
-
-        # Delete all images in the folder from Cloudinary and MongoDB
-        folder_images = list(db.images_collection.find({"folder_id": oid}))
-        for image in folder_images:
-            init_cloudinary()
-            cloudinary.uploader.destroy(
-                image["public_id"],
-                resource_type="image"
-            )
-            db.images_collection.delete_one({"_id": image["_id"]})
+        verified_folders.pop((vendor_id, oid), None)
+
+        # Images store folder_id as a string, not an ObjectId
+        image_query = {"folder_id": str(oid), "vendor_id": vendor_id}
+        folder_images = await db.images_collection.find(
+            image_query, {"public_id": 1, "thumbnailUrl": 1}).to_list(length=None)
+        public_ids = [public_id for img in folder_images if img.get("public_id")
+                      for public_id in image_asset_ids(img)]
+
+        # Cloudinary goes first: if it fails, the documents holding the
+        # public IDs are still there and the delete can be retried
+        if public_ids:
+            await delete_cloudinary_resources(public_ids)
+
+        # The folder and its image documents are then removed together
+        result, _ = await asyncio.gather(
+            db.folders_collection.delete_one({"_id": oid}),
+            db.images_collection.delete_many(image_query))
+        invalidate_image_caches(vendor_id)
         logger.debug(
-            f"Deleted {len(folder_images)} images from folder {folder_id}")
-
-        # Delete the folder from MongoDB
-        result = db.folders_collection.delete_one({"_id": oid})
+            "Deleted %s images from folder %s", len(folder_images), folder_id)
         if result.deleted_count == 0:
-            raise HTTPException(
-                status_code=404, detail="Folder not found in database")
+            # A concurrent request deleted it after our lookup
+            logger.debug("Folder %s was already deleted", folder_id)
 
         logger.info(
-            f"Deleted folder {folder_id} and its images for vendor {vendor_id}")
-        return JSONResponse(
+            "Deleted folder %s and its images for vendor %s", folder_id, vendor_id)
+        return MongoJSONResponse(
             content={"message": "Folder and its images deleted successfully"},
             status_code=200,
             media_type="application/json"
         )
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error deleting folder {folder_id}: {str(e)}")
-        return JSONResponse(
+        logger.error("Error deleting folder %s: %s", folder_id, e)
+        return MongoJSONResponse(
             status_code=500,
             content={"error": f"Failed to delete folder: {str(e)}"}
         )
@@ -1150,89 +1763,151 @@ async def delete_folder(folder_id: str):
 
 @app.delete("/images/{image_id}")
 async def delete_image(image_id: str):
-    logger.debug(f"Received request to delete image {image_id}")
+    logger.debug("Received request to delete image %s", image_id)
     try:
-        init_mongodb()
-        try:
-            oid = ObjectId(image_id)
-        except:
-            raise HTTPException(
-                status_code=400, detail="Invalid image ID format")
+        oid = parse_object_id(image_id, "Invalid image ID format")
 
-        image = db.images_collection.find_one({"_id": oid})
+        image = await db.images_collection.find_one(
+            {"_id": oid}, {"public_id": 1, "vendor_id": 1, "thumbnailUrl": 1})
         if not image:
             raise HTTPException(status_code=404, detail="Image not found")
 
-        init_cloudinary()
-        cloudinary.uploader.destroy(
-            image["public_id"],
-            resource_type="image"
-        )
-        logger.debug(f"Deleted image {image_id} from Cloudinary")
+        await delete_image_assets(image)
+        logger.debug("Deleted image %s from Cloudinary", image_id)
 
-        result = db.images_collection.delete_one({"_id": oid})
+        result = await db.images_collection.delete_one({"_id": oid})
+        invalidate_image_caches(image["vendor_id"])
         if result.deleted_count == 0:
             raise HTTPException(
                 status_code=404, detail="Image not found in database")
 
         logger.info(
-            f"Deleted image with ID {image_id} for vendor {image['vendor_id']} from Cloudinary and MongoDB")
-        return JSONResponse(
+            "Deleted image with ID %s for vendor %s from Cloudinary and MongoDB", image_id, image['vendor_id'])
+        return MongoJSONResponse(
             content={"message": "Image deleted successfully"},
             status_code=200,
             media_type="application/json"
         )
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error deleting image {image_id}: {str(e)}")
-        return JSONResponse(
+        logger.error("Error deleting image %s: %s", image_id, e)
+        return MongoJSONResponse(
             status_code=500,
             content={"error": f"Failed to delete image: {str(e)}"}
         )
 
 
+async def compute_stats(key: Tuple[str, str], compute) -> bytes:
+    stats = orjson.dumps(await compute(key[1]))
+    stats_cache[key] = stats
+    return stats
+
+
+async def cached_stats(request: Request, kind: str, vendor_id: str,
+                       compute) -> Response:
+    """
+    Stats body from stats_cache; on a miss it is computed once, even when
+    several dashboard polls for the vendor arrive together
+    """
+    key = (kind, vendor_id)
+    stats = stats_cache.get(key)
+    if stats is None:
+        task = stats_inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(compute_stats(key, compute))
+            stats_inflight[key] = task
+            task.add_done_callback(lambda _: stats_inflight.pop(key, None))
+        # A cancelled poll must not cancel the computation others wait on
+        stats = await asyncio.shield(task)
+    return etag_response(request, stats, BUCKET_CACHE_CONTROL)
+
+
 @app.get("/api/seller/image-bucket/stats", response_model=Dict[str, Any])
 async def get_bucket_stats(
+    request: Request,
     vendor_id: str = Query(..., description="Vendor ID")
 ):
     """
     Get dashboard statistics for a vendor's image bucket
     """
-    try:
-        init_mongodb()
+    return await cached_stats(request, "bucket", vendor_id, compute_bucket_stats)
 
-        # Total number of images
-        total_images = db.images_collection.count_documents(
-            {"vendor_id": vendor_id})
 
-        # Processed vs unprocessed images
-        processed_images = db.images_collection.count_documents(
-            {"vendor_id": vendor_id, "processed": True}
-        )
-        unprocessed_images = total_images - processed_images
-
-        # Total storage size (sum of all image sizes in bytes)
-        pipeline = [
+async def compute_bucket_stats(vendor_id: str) -> Dict[str, Any]:
+    """
+    Dashboard statistics for a vendor's image bucket, from one aggregation
+    """
+    try:
+        # One scan of the vendor's images feeds every statistic
+        facets = {
+            # Counts and total storage size (sum of all image sizes in bytes)
+            "totals": [
+                {"$group": {
+                    "_id": None,
+                    "total": {"$sum": 1},
+                    "processed": {"$sum": {
+                        "$cond": [{"$eq": ["$processed", True]}, 1, 0]}},
+                    "size": {"$sum": "$size"}
+                }}
+            ],
+            # Folder distribution, joined to folder names; images store
+            # folder_id as a string, and malformed ids join nothing
+            "folders": [
+                {"$group": {"_id": "$folder_id", "count": {"$sum": 1}}},
+                {"$addFields": {"folder_oid": {"$convert": {
+                    "input": "$_id", "to": "objectId",
+                    "onError": None, "onNull": None}}}},
+                {"$lookup": {
+                    "from": db.folders_collection.name,
+                    "localField": "folder_oid",
+                    "foreignField": "_id",
+                    "as": "folder"
+                }},
+                {"$project": {"count": 1, "folder_name": {
+                    "$arrayElemAt": ["$folder.folder_name", 0]}}}
+            ],
+            "formats": [
+                {"$group": {"_id": "$format", "count": {"$sum": 1}}}
+            ],
+            # Monthly upload trend (last 12 months)
+            "monthly": [
+                # Values the startup migration couldn't convert become null
+                # instead of failing the whole aggregation
+                {"$project": {"created_at": {"$convert": {
+                    "input": "$created_at", "to": "date",
+                    "onError": None, "onNull": None}}}},
+                {"$match": {"created_at": {"$ne": None}}},
+                {
+                    "$group": {
+                        "_id": {
+                            "year": {"$year": "$created_at"},
+                            "month": {"$month": "$created_at"}
+                        },
+                        "count": {"$sum": 1}
+                    }
+                },
+                {"$sort": {"_id.year": -1, "_id.month": -1}},
+                {"$limit": 12}
+            ]
+        }
+        result = (await db.images_collection.aggregate([
             {"$match": {"vendor_id": vendor_id}},
-            {"$group": {"_id": None, "total_size": {"$sum": "$size"}}}
-        ]
-        storage_result = list(db.images_collection.aggregate(pipeline))
-        total_storage = storage_result[0]["total_size"] if storage_result else 0
+            {"$facet": facets}
+        ]).to_list(length=1))[0]
 
-        # Folder distribution
-        folder_pipeline = [
-            {"$match": {"vendor_id": vendor_id}},
-            {"$group": {"_id": "$folder_id", "count": {"$sum": 1}}}
-        ]
-        folder_distribution = list(
-            db.images_collection.aggregate(folder_pipeline))
+        totals = result["totals"][0] if result["totals"] else {}
+        total_images = totals.get("total", 0)
+        processed_images = totals.get("processed", 0)
+        unprocessed_images = total_images - processed_images
+        total_storage = totals.get("size", 0)
 
-        # Process folder stats with better error handling
         folder_stats = {
             "no_folder": 0,
             "by_folder": []
         }
 
-        for f in folder_distribution:
+        for f in result["folders"]:
             folder_id = f["_id"]
             count = f["count"]
 
@@ -1240,51 +1915,23 @@ async def get_bucket_stats(
                 folder_stats["no_folder"] = count
                 continue
 
-            try:
-                folder = db.folders_collection.find_one(
-                    {"_id": ObjectId(folder_id)})
-                folder_name = folder["folder_name"] if folder else "Unknown Folder"
-            except Exception as e:
-                logger.warning(f"Error fetching folder {folder_id}: {str(e)}")
-                folder_name = "Unknown Folder"
-
             folder_stats["by_folder"].append({
                 "folder_id": str(folder_id),
                 "count": count,
-                "name": folder_name
+                "name": f.get("folder_name") or "Unknown Folder"
             })
 
-        # Format distribution
-        format_pipeline = [
-            {"$match": {"vendor_id": vendor_id}},
-            {"$group": {"_id": "$format", "count": {"$sum": 1}}}
-        ]
         format_distribution = {
-            f["_id"]: f["count"] for f in db.images_collection.aggregate(format_pipeline) if f["_id"]
+            f["_id"]: f["count"] for f in result["formats"] if f["_id"]
         }
 
-        # Monthly upload trend (last 12 months)
-        monthly_trend_pipeline = [
-            {"$match": {"vendor_id": vendor_id}},
-            {
-                "$group": {
-                    "_id": {
-                        "year": {"$year": {"$toDate": "$created_at"}},
-                        "month": {"$month": {"$toDate": "$created_at"}}
-                    },
-                    "count": {"$sum": 1}
-                }
-            },
-            {"$sort": {"_id.year": -1, "_id.month": -1}},
-            {"$limit": 12}
-        ]
         monthly_trend = [
             {
                 "year": t["_id"]["year"],
                 "month": t["_id"]["month"],
                 "count": t["count"]
             }
-            for t in db.images_collection.aggregate(monthly_trend_pipeline)
+            for t in result["monthly"]
         ]
 
         stats = {
@@ -1299,11 +1946,11 @@ async def get_bucket_stats(
             "monthly_upload_trend": monthly_trend
         }
 
-        logger.debug(f"Generated stats for vendor {vendor_id}: {stats}")
+        logger.debug("Generated stats for vendor %s: %s", vendor_id, stats)
         return stats
 
     except Exception as e:
-        logger.error(f"Error fetching stats for vendor {vendor_id}: {str(e)}")
+        logger.error("Error fetching stats for vendor %s: %s", vendor_id, e)
         raise HTTPException(
             status_code=500, detail=f"Failed to fetch bucket stats: {str(e)}")
 
@@ -1312,38 +1959,49 @@ async def get_bucket_stats(
 
 @app.get("/api/seller/image-bucket/realtime-stats", response_model=Dict[str, Any])
 async def get_realtime_stats(
+    request: Request,
     vendor_id: str = Query(..., description="Vendor ID")
 ):
     """
     Get real-time statistics (e.g., recent uploads, processing status)
     """
-    try:
-        init_mongodb()
+    return await cached_stats(request, "realtime", vendor_id, compute_realtime_stats)
 
-        # Recent uploads (last 24 hours)
-        recent_uploads = db.images_collection.count_documents({
-            "vendor_id": vendor_id,
-            "created_at": {"$gte": (datetime.now() - timedelta(hours=24)).isoformat()}
-        })
 
-        # Images currently being processed (assuming processed=False for in-progress)
-        processing_images = db.images_collection.count_documents({
-            "vendor_id": vendor_id,
-            "processed": False
-        })
+async def compute_realtime_stats(vendor_id: str) -> Dict[str, Any]:
+    """
+    Recent upload and processing counts for a vendor
+    """
+    try:
+        now = datetime.now(timezone.utc)
+
+        # Both counts are per vendor, so estimated_document_count can't serve
+        # them; each is an index range scan, and they run concurrently
+        recent_uploads, processing_images = await asyncio.gather(
+            # Recent uploads (last 24 hours) on the (vendor_id, created_at) index
+            db.images_collection.count_documents({
+                "vendor_id": vendor_id,
+                "created_at": {"$gte": now - timedelta(hours=24)}
+            }),
+            # Images currently being processed (assuming processed=False for in-progress)
+            db.images_collection.count_documents({
+                "vendor_id": vendor_id,
+                "processed": False
+            })
+        )
 
         stats = {
             "recent_uploads_24h": recent_uploads,
             "processing_images": processing_images,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now.isoformat()
         }
 
         logger.debug(
-            f"Generated real-time stats for vendor {vendor_id}: {stats}")
+            "Generated real-time stats for vendor %s: %s", vendor_id, stats)
         return stats
 
     except Exception as e:
         logger.error(
-            f"Error fetching real-time stats for vendor {vendor_id}: {str(e)}")
+            "Error fetching real-time stats for vendor %s: %s", vendor_id, e)
         raise HTTPException(
             status_code=500, detail=f"Failed to fetch real-time stats: {str(e)}")
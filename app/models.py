@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Union
 from datetime import datetime
 
@@ -6,27 +6,11 @@ from datetime import datetime
 class Folder(BaseModel):
     folder_name: str
     vendor_id: str
-    created_at: Optional[str] = None
+    created_at: Optional[datetime] = None
     _id: Optional[str] = None  # MongoDB ID
 
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-
-
-class ImageMetadata(BaseModel):
-    url: str  # Cloudinary URL
-    filename: str
-    vendor_id: str
-    processed: bool
-    public_id: str  # Cloudinary public ID
-    created_at: str
-    _id: str  # MongoDB ID for deletion
-    folder_id: Optional[str] = None  # Link to folder (optional)
-
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
+    model_config = ConfigDict(
+        populate_by_name=True, arbitrary_types_allowed=True)
 
 
 class ImageDimensions(BaseModel):
@@ -70,7 +54,7 @@ class ImageMetadata(BaseModel):
     dimensions: ImageDimensions
     format: str
     url: str
-    thumbnailUrl: str
+    thumbnailUrl: Optional[str] = None
     isPublic: bool = False
     vendor_id: str  # Added field to maintain compatibility with existing code
     processed: bool = False  # Added field to maintain compatibility with existing code
@@ -78,8 +62,7 @@ class ImageMetadata(BaseModel):
     # Added field to maintain compatibility with existing code
     folder_id: Optional[str] = None
 
-    class Config:
-        allow_population_by_field_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class ImageSearchResult(BaseModel):
@@ -88,7 +71,7 @@ class ImageSearchResult(BaseModel):
     description: Optional[str] = None
     tags: List[str] = []
     category: Optional[str] = None
-    thumbnailUrl: str
+    thumbnailUrl: Optional[str] = None
     url: str
     dimensions: ImageDimensions
     format: str
@@ -97,11 +80,13 @@ class ImageSearchResult(BaseModel):
 class PaginatedImageMetadata(BaseModel):
     images: List[ImageMetadata]
     total: int
+    next_cursor: Optional[str] = None  # Pass as `after` to fetch the next page
 
 
 class PaginatedImageSearchResults(BaseModel):
     results: List[ImageSearchResult]
     total: int
+    next_cursor: Optional[str] = None  # Pass as `after` to fetch the next page
 
 
 class FilterOptions(BaseModel):
@@ -8,16 +8,64 @@ load_dotenv()
 
 class Settings(BaseModel):
     MONGODB_URI: str = os.getenv("MONGODB_URI")
+    # Connection pool bounds per process
+    MONGODB_MAX_POOL_SIZE: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", "50"))
+    MONGODB_MIN_POOL_SIZE: int = int(os.getenv("MONGODB_MIN_POOL_SIZE", "4"))
+    # Wire compressors in order of preference; the server picks the first it supports
+    MONGODB_COMPRESSORS: str = os.getenv("MONGODB_COMPRESSORS", "zstd,zlib")
+    # Write concern for image documents, e.g. "1" to skip waiting on replicas;
+    # folders keep "majority" since their unique names rely on it
+    MONGODB_IMAGE_WRITE_CONCERN: str = os.getenv(
+        "MONGODB_IMAGE_WRITE_CONCERN", "majority")
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = int(
+        os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "3000"))
     CLOUDINARY_API_KEY: str = os.getenv("CLOUDINARY_API_KEY")
     CLOUDINARY_API_SECRET: str = os.getenv("CLOUDINARY_API_SECRET")
     CLOUDINARY_NAME: str = os.getenv("CLOUDINARY_NAME")
+    # Keep-alive connections the Cloudinary SDK may hold open per host
+    CLOUDINARY_POOL_SIZE: int = int(os.getenv("CLOUDINARY_POOL_SIZE", "32"))
+    # Concurrent Cloudinary API calls per process
+    CLOUDINARY_CONCURRENCY: int = int(os.getenv("CLOUDINARY_CONCURRENCY", "16"))
+    # Uploads above this size use chunked upload_large; Cloudinary's minimum chunk is 5 MB
+    CLOUDINARY_CHUNK_SIZE: int = int(
+        os.getenv("CLOUDINARY_CHUNK_SIZE", str(6 * 1024 * 1024)))
     CACHE_SIZE: int = int(os.getenv("CACHE_SIZE", "1000"))
     OUTPUT_QUALITY: int = int(os.getenv("OUTPUT_QUALITY", "95"))
+    # zlib level for processed PNGs; lower is faster, 9 is smallest
+    PNG_COMPRESS_LEVEL: int = int(os.getenv("PNG_COMPRESS_LEVEL", "3"))
     MAX_WORKERS: int = int(os.getenv("MAX_WORKERS", "4"))
     TEMP_DIR: str = os.getenv("TEMP_DIR", "tmp")
     KEEP_TEMP_FILES: bool = os.getenv(
         "KEEP_TEMP_FILES", "False").lower() == "true"
     STATIC_DIR: str = os.getenv("STATIC_DIR", "static")
+    # Seconds a confirmed folder ownership is trusted before re-checking;
+    # other workers may accept uploads into a deleted folder for this long
+    FOLDER_CACHE_TTL: int = int(os.getenv("FOLDER_CACHE_TTL", "60"))
+    # Seconds an image count is reused by the bucket listing and search
+    COUNT_CACHE_TTL: int = int(os.getenv("COUNT_CACHE_TTL", "30"))
+    # Seconds a serialized image search response is reused
+    SEARCH_CACHE_TTL: int = int(os.getenv("SEARCH_CACHE_TTL", "60"))
+    # Seconds a vendor's bucket filter options are reused
+    FILTER_CACHE_TTL: int = int(os.getenv("FILTER_CACHE_TTL", "300"))
+    # Seconds a vendor's dashboard stats are reused between polls
+    STATS_CACHE_TTL: int = int(os.getenv("STATS_CACHE_TTL", "20"))
+    # Background upload jobs accepted per process before new ones get a 503;
+    # each pending job holds its upload in memory
+    MAX_PENDING_UPLOAD_JOBS: int = int(os.getenv("MAX_PENDING_UPLOAD_JOBS", "32"))
+    # Seconds shutdown waits for pending upload jobs before cancelling them
+    UPLOAD_JOB_DRAIN_TIMEOUT: int = int(os.getenv("UPLOAD_JOB_DRAIN_TIMEOUT", "25"))
+    # Seconds after which an unfinished upload job is presumed lost (its
+    # process restarted) and marked failed at startup
+    UPLOAD_JOB_STALE_AFTER: int = int(os.getenv("UPLOAD_JOB_STALE_AFTER", "900"))
+    MAX_UPLOAD_BYTES: int = int(
+        os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+    REMBG_MODEL: str = os.getenv("REMBG_MODEL", "u2net")
+    # Optional path to a custom U^2-Net ONNX file, e.g. an int8 model made with
+    # onnxruntime.quantization.quantize_dynamic(
+    #     "u2net.onnx", "u2net.int8.onnx", weight_type=QuantType.QInt8)
+    REMBG_MODEL_PATH: str = os.getenv("REMBG_MODEL_PATH", "")
+    # Threads per ONNX Runtime session; 0 lets onnxruntime decide
+    REMBG_THREADS: int = int(os.getenv("REMBG_THREADS", "0"))
 
 
 settings = Settings()
@@ -1,5 +1,14 @@
 import os
+import base64
+import hashlib
 import logging
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+from bson import json_util
+from bson.objectid import ObjectId
+from fastapi import HTTPException, Request
+from fastapi.responses import ORJSONResponse, Response
 
 from .settings import settings
 
@@ -10,7 +19,127 @@ def cleanup_temp_files(file_path: str) -> None:
     if not settings.KEEP_TEMP_FILES and os.path.exists(file_path):
         try:
             os.remove(file_path)
-            logger.debug(f"Removed temporary file: {file_path}")
+            logger.debug("Removed temporary file: %s", file_path)
         except Exception as e:
             logger.error(
-                f"Failed to remove temporary file {file_path}: {str(e)}")
+                "Failed to remove temporary file %s: %s", file_path, e)
+
+
+def orjson_default(obj: Any) -> Any:
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class MongoJSONResponse(ORJSONResponse):
+    """
+    ORJSONResponse that also serializes MongoDB ObjectIds as strings
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Plain ASGI middleware capping request bodies on the given paths. Answers
+    413 up front when Content-Length is over the limit and otherwise counts
+    the bytes as they arrive, so chunked bodies are capped too. Every other
+    request passes straight through.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Upload exceeds {limit} bytes"
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            response = MongoJSONResponse(status_code=413, content={"detail": detail})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            received += len(message.get("body", b""))
+            if received > limit:
+                # Raised while the form is parsed, so FastAPI turns it into the response
+                raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+def encode_cursor(doc: Dict[str, Any], sort_field: str) -> str:
+    """
+    Build an opaque keyset cursor from the last document of a page
+    """
+    payload = json_util.dumps({"v": doc.get(sort_field), "id": doc["_id"]})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def keyset_filter(after: str, sort_field: str, sort_direction: int) -> Dict[str, Any]:
+    """
+    Translate a cursor into a filter selecting documents after it in
+    (sort_field, _id) order. Raises ValueError for malformed cursors.
+    """
+    try:
+        data = json_util.loads(base64.urlsafe_b64decode(after.encode()))
+        value, last_id = data["v"], data["id"]
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {str(e)}")
+    if not isinstance(last_id, ObjectId):
+        raise ValueError("Invalid cursor: missing document id")
+
+    op = "$lt" if sort_direction < 0 else "$gt"
+    if sort_field == "_id":
+        return {"_id": {op: last_id}}
+    # Range operators never match null or missing values, which sort before
+    # every other value, so they get their own branch
+    branches = [{sort_field: value, "_id": {op: last_id}}]
+    if value is None:
+        if sort_direction > 0:
+            branches.append({sort_field: {"$ne": None}})
+    else:
+        branches.append({sort_field: {op: value}})
+        if sort_direction < 0:
+            branches.append({sort_field: None})
+    return {"$or": branches}
+
+
+def page_cursor(results: list, limit: int, sort_field: str) -> Tuple[list, Optional[str]]:
+    """
+    Split results fetched with limit + 1 into the page itself and the cursor
+    for the next one, which is None when the extra row is absent
+    """
+    if len(results) <= limit:
+        return results, None
+    page = results[:limit]
+    return page, encode_cursor(page[-1], sort_field)
+
+
+def etag_response(request: Request, body: bytes, cache_control: str) -> Response:
+    """
+    JSON response carrying a weak ETag of its body; answers 304 when the
+    client already holds the same representation
+    """
+    etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in
+                          (tag.strip() for tag in if_none_match.split(","))):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)